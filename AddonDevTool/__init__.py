@@ -0,0 +1,44 @@
+'''
+Addon Development Tool
+Copyright 2015 Nathan Craddock
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+bl_info = {
+    "name": "Addon Development Tool",
+    "description": "Removes redundancy and repetition in the creating and testing of Blender addons",
+    "author": "Nathan Craddock",
+    "version": (1, 0),
+    "blender": (2, 76, 0),
+    "location": "Properties shelf of the text editor",
+    "warning": "",
+    "support": "COMMUNITY",
+    "category": "Text Editor"
+}
+
+# Everything that needs bpy lives in the ui module, which is only imported when
+# Blender registers the addon. The core module can be used outside of Blender.
+if "ui" in locals():
+    import importlib
+    importlib.reload(core)
+    importlib.reload(ui)
+
+
+def register():
+    from . import ui
+    ui.register()
+
+
+def unregister():
+    from . import ui
+    ui.unregister()
@@ -0,0 +1,297 @@
+'''
+Addon Development Tool
+Copyright 2015 Nathan Craddock
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# Validate and export projects without the UI, for scripts and CI.
+#
+#   python -m AddonDevTool.cli validate [PROJECT ...]
+#   python -m AddonDevTool.cli export -o dist [PROJECT ...]
+#   python -m AddonDevTool.cli verify -o dist --target ADDONS_FOLDER [PROJECT ...]
+#   blender --background --python AddonDevTool/cli.py -- export -o dist [PROJECT ...]
+#
+# A PROJECT is a name or id from ADTProjects.json, or the path of an addon folder or file.
+# Without any, every saved project is used.
+#
+# Exit codes: 0 when everything passed, 1 when a project failed, 2 for bad arguments or when there
+# are no projects to work on.
+
+import os
+import sys
+import json
+import time
+import glob
+import importlib
+import argparse
+
+# Run as a file by Blender, the package isn't imported yet
+if not __package__:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from AddonDevTool.core import (read_projects, get_file_index, validate_project, export_project, get_addon_name,
+                                   run_batch, read_manifest, verify_manifest, MemoryPeak, check_syntax,
+                                   get_file_table, batch_pool, duplicate_outputs, ZIP_METHODS, MANIFEST_SUFFIX)
+else:
+    from .core import (read_projects, get_file_index, validate_project, export_project, get_addon_name, run_batch,
+                       read_manifest, verify_manifest, MemoryPeak, check_syntax, get_file_table, batch_pool,
+                       duplicate_outputs, ZIP_METHODS, MANIFEST_SUFFIX)
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def get_bpy():
+    # bpy when running inside Blender, only imported when it's needed
+    try:
+        return sys.modules.get('bpy') or importlib.import_module('bpy')
+    except ImportError:
+        return None
+
+
+def default_projects_file():
+    # ADTProjects.json of the running Blender, otherwise the newest one in the user config
+    bpy = get_bpy()
+    if bpy:
+        return os.path.join(bpy.utils.script_path_user(), "ADTProjects.json")
+
+    if sys.platform == 'win32':
+        config = os.path.join(os.environ.get('APPDATA', ""), "Blender Foundation", "Blender")
+    elif sys.platform == 'darwin':
+        config = os.path.expanduser("~/Library/Application Support/Blender")
+    else:
+        config = os.path.join(os.environ.get('XDG_CONFIG_HOME', os.path.expanduser("~/.config")), "blender")
+
+    found = glob.glob(os.path.join(config, "*", "scripts", "ADTProjects.json"))
+    if not found:
+        return None
+
+    def version(filepath):
+        name = os.path.basename(os.path.dirname(os.path.dirname(filepath)))
+        return tuple(int(v) if v.isdigit() else 0 for v in name.split('.'))
+
+    return max(found, key=version)
+
+
+def default_addons_folder():
+    # Addons folder of the running Blender
+    bpy = get_bpy()
+    return bpy.utils.user_resource('SCRIPTS', "addons") if bpy else None
+
+
+def blender_version(text):
+    # The Blender version to validate against, from --blender or the running Blender
+    if text:
+        return tuple(int(v) for v in text.split('.'))
+
+    bpy = get_bpy()
+    return tuple(bpy.app.version) if bpy else None
+
+
+def find_projects(names, projects_file):
+    # (name, id, record) for each requested project, every saved one if none are given
+    saved = read_projects(projects_file) if projects_file else []
+    if not names:
+        return [(record.get('name', uid), uid, record) for uid, record in saved]
+
+    found = []
+    for name in names:
+        matches = [(record.get('name', uid), uid, record) for uid, record in saved
+                   if name in (uid, record.get('name'))]
+        if matches:
+            found.extend(matches)
+        elif os.path.exists(name):
+            path = os.path.abspath(name)
+            found.append((get_addon_name(path), None, {'location': path}))
+        else:
+            raise LookupError("Unknown project {0}".format(name))
+
+    return found
+
+
+def project_files(record):
+    # Files of a saved project, using its ignore patterns like the panel does
+    patterns = tuple(p.strip() for p in record.get('ignore', "").split(',') if p.strip())
+    path = os.path.abspath(os.path.expanduser(record['location']))
+
+    index = get_file_index(path, patterns, record.get('use_gitignore', True))
+    index.refresh()
+    return path, index.files(), get_file_table(record.get('id', path), index)
+
+
+def validate_job(record, version, pool):
+    # bl_info problems of addons and scripts that don't compile
+    path, files, table = project_files(record)
+    messages = validate_project(path, version).messages if record.get('is_addon', True) else []
+    if os.path.exists(path):
+        messages = messages + check_syntax(table, files, pool)
+
+    return {'messages': messages}
+
+
+def export_filepath(record, output):
+    return os.path.join(output, get_addon_name(os.path.abspath(os.path.expanduser(record['location']))) + ".zip")
+
+
+def export_job(record, version, output, method, level, force, pool):
+    path, files, table = project_files(record)
+    messages = validate_job(record, version, pool)['messages']
+    if messages and not force:
+        return {'messages': messages}
+
+    filepath = export_filepath(record, output)
+    stats = export_project(path, files, filepath, method, level, table=table, pool=pool)
+
+    return {'messages': messages, 'archive': filepath, 'files': stats.files, 'bytes': stats.bytes_out,
+            'reused': stats.reused, 'skipped': stats.skipped}
+
+
+def verify_job(record, output, target, content):
+    # Compare an installed copy with the manifest of the project's last export
+    path = os.path.abspath(os.path.expanduser(record['location']))
+    manifest = read_manifest(os.path.join(output, get_addon_name(path) + ".zip" + MANIFEST_SUFFIX))
+    if manifest is None:
+        return {'messages': ["no manifest, export the project first"]}
+
+    return {'messages': ["differs: " + p for p in verify_manifest(manifest, target, content)]}
+
+
+def run(args):
+    # Run a command, returning the exit code
+    projects_file = args.registry or default_projects_file()
+    try:
+        # Paths still work without a project list, but a missing one is only fine when nothing needs it
+        if args.registry and not os.path.isfile(args.registry):
+            raise LookupError("No project list at {0}".format(args.registry))
+
+        projects = find_projects(args.projects, projects_file)
+        if not projects and not args.projects:
+            raise LookupError("No saved projects in {0}".format(projects_file) if projects_file else
+                              "No project list found, pass --registry or name the projects")
+        version = blender_version(args.blender)
+    except (LookupError, ValueError, OSError) as e:
+        print("error: {0}".format(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.command == 'list':
+        rows = [{'name': name, 'id': uid, 'location': record.get('location', "")} for name, uid, record in projects]
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for row in rows:
+                print("{0:<30} {1}".format(row['name'], row['location']))
+        return EXIT_OK
+
+    pool = batch_pool()
+    if args.command == 'validate':
+        jobs = [(name, validate_job, (record, version, pool)) for name, uid, record in projects]
+    elif args.command == 'verify':
+        target = args.target or default_addons_folder()
+        if not target:
+            print("error: --target is needed outside of Blender", file=sys.stderr)
+            return EXIT_USAGE
+        jobs = [(name, verify_job, (record, args.output, target, args.content)) for name, uid, record in projects]
+    else:
+        # Projects with the same folder name would write the same zip file at the same time
+        duplicates = duplicate_outputs((record['location'], export_filepath(record, args.output))
+                                       for name, uid, record in projects)
+        for path, locations in duplicates:
+            print("error: {0} would be exported to the same file {1}".format(", ".join(locations), path),
+                  file=sys.stderr)
+        if duplicates:
+            return EXIT_USAGE
+
+        os.makedirs(args.output, exist_ok=True)
+        jobs = [(name, export_job, (record, version, args.output, args.compression, args.level, args.force, pool))
+                for name, uid, record in projects]
+
+    start = time.perf_counter()
+    # Tracing every allocation makes big exports several times slower, so it is only done when asked for
+    with pool, MemoryPeak(args.memory) as memory:
+        results = run_batch(jobs)
+    seconds = time.perf_counter() - start
+
+    rows = []
+    for (name, uid, record), result in zip(projects, results):
+        row = {'name': name, 'id': uid, 'location': record.get('location', ""), 'seconds': result.seconds}
+        if result.ok:
+            row.update(result.value)
+            row['ok'] = 'archive' in row if args.command == 'export' else not row['messages']
+        else:
+            row.update(ok=False, messages=[result.message])
+        rows.append(row)
+
+    ok = all(row['ok'] for row in rows)
+
+    if args.json:
+        print(json.dumps({'command': args.command, 'ok': ok, 'seconds': seconds,
+                          'peak_memory': memory.peak if args.memory else None, 'projects': rows}, indent=2))
+    else:
+        for row in rows:
+            status = "ok" if row['ok'] else "FAILED"
+            print("{0:<30} {1:<6} {2:>8.1f} ms  {3}".format(row['name'], status, row['seconds'] * 1000,
+                                                           row.get('archive', "")))
+            for message in row['messages']:
+                print("    " + message)
+        summary = "{0} projects in {1:.0f} ms".format(len(rows), seconds * 1000)
+        print("{0}, {1}".format(summary, memory) if args.memory else summary)
+
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="AddonDevTool.cli", description="Validate and export addon projects")
+    parser.add_argument('--registry', help="project list to read, defaults to the one of the newest Blender")
+    parser.add_argument('--blender', help="Blender version to check bl_info against, like 2.79")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    parser.add_argument('--memory', action='store_true', help="measure the peak Python memory use, which makes "
+                                                              "the run several times slower")
+
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    for command in ('list', 'validate', 'export', 'verify'):
+        sub = commands.add_parser(command)
+        sub.add_argument('projects', nargs='*', help="project names, ids or paths, every saved project if none")
+
+        if command in ('export', 'verify'):
+            sub.add_argument('-o', '--output', default=".", help="folder the zip files and manifests are in")
+
+        if command == 'verify':
+            sub.add_argument('--target', help="folder the addons are installed in, Blender's addons folder "
+                                              "when running in Blender")
+            sub.add_argument('--content', action='store_true', help="compare contents, not just sizes")
+
+        if command == 'export':
+            sub.add_argument('--compression', choices=sorted(ZIP_METHODS), default='DEFLATED')
+            sub.add_argument('--level', type=int, default=6, choices=range(10), metavar="0-9")
+            sub.add_argument('--force', action='store_true', help="export projects that fail validation or "
+                                                                  "have scripts that don't compile")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+        # Blender passes the script's own arguments after --
+        if get_bpy():
+            argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    return run(parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1753 @@
+'''
+Addon Development Tool
+Copyright 2015 Nathan Craddock
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+# Project registry, file index, validation and packaging logic.
+# Nothing in here imports bpy, so it can be run and measured outside of Blender.
+
+import os
+import json
+import hashlib
+import time
+import threading
+import shutil
+import sys
+import importlib
+import struct
+import ast
+import re
+import zlib
+import lzma
+import functools
+import cProfile
+import uuid
+import mmap
+import tracemalloc
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Project properties saved in the registry
+PROJECT_FIELDS = ('name', 'location', 'is_addon', 'ignore', 'use_gitignore')
+
+# Version 1 was a plain list of [name, location, is_addon] lists
+REGISTRY_VERSION = 2
+
+# Version of the file index cache saved next to the registry
+INDEX_CACHE_VERSION = 1
+
+
+def new_project_id():
+    return uuid.uuid4().hex
+
+
+class ProjectStore:
+    """ Writes the project list to disk, but only when it has actually changed """
+
+    def __init__(self, debounce=1.0):
+        # Seconds to wait after the last change before writing
+        self.debounce = debounce
+
+        # Bumped by the project properties and operators whenever something changes
+        self.generation = 0
+        self.checked = None
+
+        self.saved_hash = None
+        self.pending = None
+        self.pending_hash = None
+        self.pending_since = 0.0
+
+        # Counters of how often the handler wrote the file or had nothing to do
+        self.writes = 0
+        self.skipped = 0
+
+        # Project id -> metadata kept with the project, like its cached file index
+        self.meta = {}
+
+        # Records of the project list last seen by update, None until there was one
+        self.projects = None
+
+    def mark_changed(self):
+        self.generation += 1
+
+    def load(self, projects):
+        # Keep the metadata of projects read from the registry
+        for uid, record in projects.items():
+            if record.get('meta'):
+                self.meta.setdefault(uid, {}).update(record['meta'])
+
+    def get_meta(self, uid, key, default=None):
+        return self.meta.get(uid, {}).get(key, default)
+
+    def take_meta(self, uid, key):
+        # Remove and return a value without marking the registry changed,
+        # for values that are only written back when flushing
+        return self.meta.get(uid, {}).pop(key, None)
+
+    def set_meta(self, uid, key, value):
+        meta = self.meta.setdefault(uid, {})
+        if meta.get(key) != value:
+            meta[key] = value
+            self.mark_changed()
+
+    def reset(self):
+        # Forget what was last checked, e.g. after a new blend file is loaded
+        self.checked = None
+
+    def update(self, project_list):
+        # Serialize the project list if it may have changed since the last check
+        key = (self.generation, len(project_list))
+        if key == self.checked:
+            return
+        self.checked = key
+
+        # Don't save if there aren't any addons
+        if len(project_list) == 0:
+            return
+
+        self.projects = []
+        for p in project_list:
+            record = {field: getattr(p, field) for field in PROJECT_FIELDS}
+            record['id'] = p.uid
+            self.projects.append(record)
+
+        self.serialize()
+
+    def serialize(self):
+        # Queue the project list last seen by update with the current metadata
+        # This doesn't need the project list itself, so it also works after Blender freed its data
+        if self.projects is None:
+            return
+
+        projects = []
+        for record in self.projects:
+            if self.meta.get(record['id']):
+                record = dict(record, meta=self.meta[record['id']])
+            projects.append(record)
+
+        data = json.dumps({'version': REGISTRY_VERSION, 'projects': projects}, sort_keys=True)
+        digest = hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+        if digest == self.saved_hash:
+            # Changed back to what is already on disk
+            self.pending = None
+        elif digest != self.pending_hash:
+            self.pending = data
+            self.pending_hash = digest
+            self.pending_since = time.time()
+
+    def save(self, filepath, force=False):
+        # Write pending changes once the debounce window has passed
+        if self.pending is None or (not force and time.time() - self.pending_since < self.debounce):
+            self.skipped += 1
+            return False
+
+        # Write to a temporary file first so a crash never leaves a half written file
+        temp = filepath + ".tmp"
+        with open(temp, 'w') as savefile:
+            savefile.write(self.pending)
+        os.replace(temp, filepath)
+
+        self.saved_hash = self.pending_hash
+        self.pending = None
+        self.pending_hash = None
+        self.writes += 1
+        return True
+
+
+def read_projects(filepath):
+    # Load the saved projects as a list of (id, record) in their saved order
+    if not os.path.isfile(filepath):
+        return []
+
+    with open(filepath) as readfile:
+        data = json.load(readfile)
+
+    # Upgrade version 1 files, giving every project a new id
+    if isinstance(data, list):
+        return [(new_project_id(), dict(zip(PROJECT_FIELDS, p))) for p in data]
+
+    return [(record.get('id') or new_project_id(), record) for record in data.get('projects', [])]
+
+
+def read_index_cache(filepath):
+    # Project id -> file index snapshot, empty if the cache is missing or from another version
+    # It is only a cache, so a broken one is ignored and rebuilt by rescanning
+    try:
+        with open(filepath) as readfile:
+            data = json.load(readfile)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get('version') != INDEX_CACHE_VERSION:
+        return {}
+    return data.get('indexes', {})
+
+
+def write_index_cache(filepath, snapshots):
+    # Kept apart from the registry, so the large folder listings aren't serialized and hashed with every change
+    temp = filepath + ".tmp"
+    with open(temp, 'w') as savefile:
+        json.dump({'version': INDEX_CACHE_VERSION, 'indexes': snapshots}, savefile)
+    os.replace(temp, filepath)
+
+
+# Files and folders left out of every project
+DEFAULT_IGNORE = (".git/", ".svn/", ".hg/", "__pycache__/", ".idea/", ".vscode/", "*.pyc", "*.pyo",
+                  ".DS_Store", "Thumbs.db", "*.blend1", "*.blend2", "*.swp", "*~")
+
+
+def glob_to_regex(pattern):
+    # Translate a gitignore glob, where only ** matches across folders
+    regex = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+            continue
+        elif pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+            continue
+        elif c == '*':
+            regex.append('[^/]*')
+        elif c == '?':
+            regex.append('[^/]')
+        elif c == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            chars = pattern[i + 1:end].replace('\\', '\\\\')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            regex.append('[' + chars + ']')
+            i = end
+        else:
+            regex.append(re.escape(c))
+        i += 1
+
+    return ''.join(regex)
+
+
+class IgnoreRules:
+    """ Gitignore style patterns compiled into a matcher for relative paths """
+
+    def __init__(self, patterns):
+        # (regex, negated, folders only), later rules override earlier ones
+        self.rules = []
+
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+
+            negated = pattern.startswith('!')
+            pattern = pattern.lstrip('!')
+            folders_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+
+            # Patterns with a slash are relative to the project root, others match at any depth
+            if '/' in pattern:
+                regex = '^' + glob_to_regex(pattern.lstrip('/')) + '$'
+            else:
+                regex = '^(?:.*/)?' + glob_to_regex(pattern) + '$'
+
+            self.rules.append((re.compile(regex), negated, folders_only))
+
+    def ignored(self, path, is_folder):
+        # path is relative to the project root, using forward slashes
+        ignored = False
+        for regex, negated, folders_only in self.rules:
+            if (is_folder or not folders_only) and ignored == negated and regex.match(path):
+                ignored = not negated
+
+        return ignored
+
+
+def read_gitignore(path):
+    # Patterns from a .gitignore file, or nothing if there is none
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+class FileIndex:
+    """ Caches the files of a project, only rescanning folders that have changed """
+
+    # Seconds between checks of the folder modification times
+    rescan_interval = 0.5
+
+    def __init__(self, path, patterns=(), use_gitignore=True):
+        self.path = path
+        self.patterns = patterns
+        self.use_gitignore = use_gitignore
+
+        # None until the rules are compiled on the first refresh
+        self.gitignore_mtime = -1
+        self.rule_patterns = None
+        self.rules = None
+
+        # Relative folder path -> (mtime, file names, subfolder names)
+        self.folders = {}
+
+        # Bumped whenever the list of files changes
+        self.generation = 0
+        self.scanned = 0.0
+        self.views = {}
+
+    def invalidate(self):
+        # Check the folders again on the next refresh
+        self.scanned = 0.0
+
+    def refresh(self):
+        now = time.time()
+        if now - self.scanned < self.rescan_interval:
+            return
+        self.scanned = now
+
+        folders = {}
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            stat = None
+
+        # For single-file addons
+        if stat is not None and not os.path.isdir(self.path):
+            folders[""] = (stat.st_mtime, (os.path.basename(self.path),), ())
+
+        # Multi-file addons, only listing the folders whose mtime changed
+        elif stat is not None:
+            self.update_rules()
+
+            stack = [("", stat.st_mtime)]
+            while stack:
+                folder, mtime = stack.pop()
+                entry = self.folders.get(folder)
+                if entry is None or entry[0] != mtime:
+                    entry = self.scan_folder(folder, mtime)
+                folders[folder] = entry
+
+                for name in entry[2]:
+                    sub = os.path.join(folder, name)
+                    try:
+                        stack.append((sub, os.stat(os.path.join(self.path, sub)).st_mtime))
+                    except OSError:
+                        pass
+
+        if folders != self.folders:
+            self.folders = folders
+            self.generation += 1
+            self.views.clear()
+
+    def update_rules(self):
+        # Compile the ignore rules again when the .gitignore file changed
+        gitignore = os.path.join(self.path, ".gitignore")
+        mtime = None
+        if self.use_gitignore:
+            try:
+                mtime = os.stat(gitignore).st_mtime
+            except OSError:
+                pass
+
+        if mtime == self.gitignore_mtime:
+            return
+        self.gitignore_mtime = mtime
+
+        gitignore_patterns = tuple(read_gitignore(gitignore)) if mtime is not None else ()
+        rule_patterns = DEFAULT_IGNORE + gitignore_patterns + tuple(self.patterns)
+
+        if rule_patterns != self.rule_patterns:
+            self.rule_patterns = rule_patterns
+            self.rules = IgnoreRules(rule_patterns)
+
+            # Every folder has to be listed again with the new rules
+            self.folders = {}
+
+    def snapshot(self):
+        # The listed folders, to be saved and restored in a later session
+        return {'path': self.path,
+                'rules': list(self.rule_patterns or ()),
+                'folders': {folder: [entry[0], list(entry[1]), list(entry[2])]
+                            for folder, entry in self.folders.items()}}
+
+    def restore(self, snapshot):
+        # Start from a snapshot, the next refresh only lists the folders changed since
+        if snapshot.get('path') != self.path or self.folders:
+            return
+
+        self.rule_patterns = tuple(snapshot['rules'])
+        self.rules = IgnoreRules(self.rule_patterns)
+        self.folders = {folder: (entry[0], tuple(entry[1]), tuple(entry[2]))
+                        for folder, entry in snapshot['folders'].items()}
+
+    def scan_folder(self, folder, mtime):
+        full = os.path.join(self.path, folder)
+        prefix = folder.replace(os.sep, '/') + '/' if folder else ''
+        files = []
+        subfolders = []
+
+        try:
+            names = sorted(os.listdir(full))
+        except OSError:
+            names = []
+
+        # Ignored folders are pruned here, so nothing below them is ever listed
+        for name in names:
+            file = os.path.join(full, name)
+            if os.path.isdir(file):
+                # Like os.walk, don't follow links to other folders
+                if not os.path.islink(file) and not self.rules.ignored(prefix + name, True):
+                    subfolders.append(name)
+            elif not self.rules.ignored(prefix + name, False):
+                files.append(name)
+
+        return (mtime, tuple(files), tuple(subfolders))
+
+    def files(self, ending=""):
+        # Relative paths of all files ending with ending, served from memory
+        # Every view is filtered from the full list, so each path is only stored once
+        # and the file table keys are the same strings
+        view = self.views.get(ending)
+        if view is None:
+            if ending:
+                view = tuple(file for file in self.files() if file.endswith(ending))
+            else:
+                view = tuple(os.path.join(folder, name) for folder in sorted(self.folders)
+                             for name in self.folders[folder][1])
+            self.views[ending] = view
+
+        return view
+
+    def paths(self, ending=""):
+        # Normalized absolute paths of the files ending with ending
+        key = ('paths', ending)
+        view = self.views.get(key)
+        if view is None:
+            root = self.path if os.path.isdir(self.path) else os.path.dirname(self.path)
+            view = frozenset(os.path.normpath(os.path.join(root, file)) for file in self.files(ending))
+            self.views[key] = view
+
+        return view
+
+
+file_indexes = {}
+
+
+def get_file_index(path, patterns=(), use_gitignore=True):
+    # Return the up to date file index for the folder or file at path
+    index = file_indexes.get(path)
+    if index is None or index.patterns != patterns or index.use_gitignore != use_gitignore:
+        index = file_indexes[path] = FileIndex(path, patterns, use_gitignore)
+
+    index.refresh()
+    return index
+
+
+class FileRecord:
+    """ Size, modification time, permissions and content hash of a project file """
+
+    __slots__ = ('size', 'mtime', 'mode', 'hash')
+
+    def __init__(self, size, mtime, mode):
+        self.size = size
+        self.mtime = mtime
+        self.mode = mode
+        self.hash = None
+
+
+class FileTable:
+    """ What is known about the files of a project, shared by fingerprints, syncing and pre-flight checks """
+
+    def __init__(self, path):
+        self.path = path
+
+        # Relative path -> FileRecord
+        self.records = {}
+
+        # Generation of the file index the records were last pruned to
+        self.generation = -1
+
+        # Tasks and batch jobs use the table from worker threads while the main thread prunes it
+        self.lock = threading.Lock()
+
+    def source(self, file):
+        return os.path.join(self.path, file) if os.path.isdir(self.path) else self.path
+
+    def stat(self, file):
+        # The record of a file, starting a new one when the file changed on disk
+        stat = os.stat(self.source(file))
+        with self.lock:
+            record = self.records.get(file)
+            if (record is None or record.size != stat.st_size or record.mtime != stat.st_mtime
+                    or record.mode != stat.st_mode):
+                record = self.records[file] = FileRecord(stat.st_size, stat.st_mtime, stat.st_mode)
+
+        return record
+
+    def hash(self, file):
+        # Content hash of a file, only read again when it changed
+        record = self.stat(file)
+        if record.hash is None:
+            record.hash = hash_file(self.source(file))
+
+        return record.hash
+
+    def prune(self, index):
+        # Forget files that are no longer part of the project
+        if self.generation != index.generation:
+            files = set(index.files())
+            with self.lock:
+                self.generation = index.generation
+                for file in [f for f in self.records if f not in files]:
+                    del self.records[file]
+
+
+# Project id -> FileTable
+file_tables = {}
+
+
+def get_file_table(key, index):
+    # The file table of a project, keyed by its id, for the files in its index
+    table = file_tables.get(key)
+    if table is None or table.path != index.path:
+        table = file_tables[key] = FileTable(index.path)
+
+    table.prune(index)
+    return table
+
+
+class FileWatcher:
+    """ Polls files from a background thread and queues the ones that changed on disk """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+
+        self.lock = threading.Lock()
+        self.paths = ()
+        self.changed = set()
+        self.updated = 0.0
+
+        # Only used by the watcher thread: path -> (mtime, size)
+        self.snapshots = {}
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="ADT File Watcher")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+            self.snapshots = {}
+
+            with self.lock:
+                self.changed.clear()
+
+    def watch(self, paths):
+        # Set the files to watch, called from the main thread
+        with self.lock:
+            self.paths = tuple(paths)
+        self.updated = time.time()
+
+    def take(self, count):
+        # Remove and return up to count changed paths
+        with self.lock:
+            batch = list(self.changed)[:count]
+            self.changed.difference_update(batch)
+
+        return batch
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        with self.lock:
+            paths = self.paths
+
+        snapshots = {}
+        changed = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            snapshot = (stat.st_mtime, stat.st_size)
+            old = self.snapshots.get(path)
+            if old is not None and old != snapshot:
+                changed.append(path)
+            snapshots[path] = snapshot
+
+        self.snapshots = snapshots
+
+        if changed:
+            with self.lock:
+                self.changed.update(changed)
+
+
+class ProjectStatus:
+    """ What the panel and polls show about a project, computed away from the draw path """
+
+    def __init__(self):
+        self.exists = False
+        self.is_folder = False
+        self.messages = []
+        self.bl_info = None
+
+        self.file_count = 0
+        self.opened = 0
+        self.unopened = ()
+
+        self.installed = False
+        self.fingerprint = None
+
+        # Scripts that didn't compile the last time the project was installed or exported
+        self.compile_errors = []
+
+        # Generations of the file and text indexes the open state was counted from
+        self.open_key = None
+
+        # A dirty status is still shown until the next update replaces it, 0 until the first one
+        self.dirty = True
+        self.updated = 0.0
+
+
+class ProjectInfo:
+    """ Result of validating a project """
+
+    def __init__(self, key, messages, bl_info):
+        # (main file, mtime, size) the result was computed from
+        self.key = key
+        self.messages = messages
+        self.bl_info = bl_info
+        self.checked = time.time()
+
+
+# Project path -> ProjectInfo
+validation_cache = {}
+
+
+def read_bl_info(mainfile):
+    # Parse the bl_info dictionary of an addon without running it
+    # Returns the dictionary (or None) and a list of problems
+    with open(mainfile, 'rb') as f:
+        source = f.read()
+
+    try:
+        tree = ast.parse(source, mainfile)
+    except (SyntaxError, ValueError) as e:
+        return None, ["syntax error on line {0}".format(getattr(e, 'lineno', '?'))]
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == 'bl_info' for t in node.targets):
+            try:
+                bl_info = ast.literal_eval(node.value)
+            except ValueError:
+                return None, ["bl_info must only contain literal values"]
+
+            if not isinstance(bl_info, dict):
+                return None, ["bl_info is not a dictionary"]
+            return bl_info, []
+
+    return None, ["missing bl_info"]
+
+
+def validate_project(path, blender_version=None):
+    # Checks if addon has a bl_info
+    # If a package, check for __init__.py
+    # Checks the required Blender version when blender_version is given
+    # The result is cached until the main file changes
+    now = time.time()
+    cached = validation_cache.get(path)
+    if cached and now - cached.checked < FileIndex.rescan_interval:
+        return cached
+
+    # Determine whether it is a multifile addon and get mainfile name
+    is_package = os.path.isdir(path)
+    mainfile = os.path.join(path, '__init__.py') if is_package else path
+
+    try:
+        stat = os.stat(mainfile)
+        key = (mainfile, stat.st_mtime, stat.st_size)
+    except OSError:
+        key = (mainfile, None, None)
+
+    if cached and cached.key == key:
+        cached.checked = now
+        return cached
+
+    messages = []
+    bl_info = None
+
+    if key[1] is None:
+        messages.append("missing __init__.py" if is_package else "file not found")
+    else:
+        if not is_package and os.path.basename(path) == "__init__.py":
+            messages.append("__init__.py is only for packages")
+
+        bl_info, errors = read_bl_info(mainfile)
+        messages.extend(errors)
+
+        if bl_info:
+            if not bl_info.get('name'):
+                messages.append("bl_info has no name")
+
+            blender = bl_info.get('blender')
+            if blender_version and isinstance(blender, tuple) and blender > blender_version:
+                messages.append("requires Blender {0}".format(".".join(str(v) for v in blender)))
+
+    info = validation_cache[path] = ProjectInfo(key, messages, bl_info)
+    return info
+
+
+class Cancelled(Exception):
+    """ Raised in a worker when the task it runs was cancelled """
+
+
+class Task:
+    """ Progress and cancellation shared between a worker thread and whatever is waiting on it """
+
+    def __init__(self):
+        self.done = 0
+        self.total = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def step(self, count=1):
+        # Count finished work, stopping the worker if it was cancelled
+        if self.cancelled:
+            raise Cancelled()
+        self.done += count
+
+    def fraction(self):
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+
+# Content hash -> (line, message) of the compile error of a script, or None if it compiles
+# The file name is only added when looking it up, so files with the same content or renamed files get their own
+compile_cache = {}
+
+
+def compile_file(table, file):
+    # Byte-compile a script without writing a .pyc, returning the error or None
+    # Unchanged scripts are looked up by the hash in the file table without reading them
+    name = file if os.path.isdir(table.path) else os.path.basename(table.path)
+    sha1 = table.hash(file)
+
+    if sha1 not in compile_cache:
+        with open(table.source(file), 'rb') as f:
+            source = f.read()
+
+        try:
+            compile(source, name, 'exec', dont_inherit=True)
+            compile_cache[sha1] = None
+        except SyntaxError as e:
+            compile_cache[sha1] = (e.lineno, e.msg)
+        except ValueError as e:
+            compile_cache[sha1] = (None, str(e))
+
+    error = compile_cache[sha1]
+    if error is None:
+        return None
+
+    lineno, message = error
+    if lineno:
+        return "{0}:{1}: {2}".format(name, lineno, message)
+    return "{0}: {1}".format(name, message)
+
+
+def parallel_map(func, items, pool=None):
+    # List of func applied to each item, in the given shared pool or in one of their own
+    # Batch jobs share one pool, instead of each starting cpu_count threads of its own
+    if pool is not None:
+        return list(pool.map(func, items))
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as own:
+        return list(own.map(func, items))
+
+
+def check_syntax(table, files, pool=None):
+    # Compile every script of a project in parallel, returning the errors sorted by file
+    scripts = [file for file in files if file.endswith('.py')]
+
+    errors = parallel_map(lambda file: compile_file(table, file), scripts, pool)
+    return sorted(error for error in errors if error)
+
+
+class ArchiveStats:
+    """ Sizes and timings from building an archive """
+
+    def __init__(self):
+        self.files = 0
+        self.cached = 0
+        self.reused = 0
+        self.skipped = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        if self.skipped:
+            return "{0} files unchanged, archive is up to date ({1:.2f}s)".format(self.files, self.seconds)
+        return "{0} files ({1} cached, {2} reused), {3} KB -> {4} KB in {5:.2f}s".format(
+            self.files, self.cached, self.reused, self.bytes_in // 1024, self.bytes_out // 1024, self.seconds)
+
+
+# Zip method numbers and the version needed to extract them
+ZIP_METHODS = {'STORED': (0, 20), 'DEFLATED': (8, 20), 'LZMA': (14, 63)}
+
+# LZMA dictionary size for each preset level
+LZMA_DICT_SIZES = (1 << 18, 1 << 20, 1 << 21, 1 << 22, 1 << 22, 1 << 23, 1 << 23, 1 << 24, 1 << 25, 1 << 26)
+
+class CompressedCache:
+    """ Compressed data of archive members by content, dropping the least recently used past a total size """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.size = 0
+
+        # (Content hash, method, level) -> (crc, compressed data), least recently used first
+        self.items = OrderedDict()
+
+        # Used by the archive workers
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is not None:
+                self.items.move_to_end(key)
+            return item
+
+    def put(self, key, crc, blob):
+        if len(blob) > self.limit:
+            return
+
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+
+            self.items[key] = (crc, blob)
+            self.size += len(blob)
+            while self.size > self.limit:
+                key, (crc, blob) = self.items.popitem(last=False)
+                self.size -= len(blob)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.size = 0
+
+
+# Most bytes of compressed data kept between exports
+COMPRESSED_CACHE_SIZE = 64 << 20
+
+compressed_cache = CompressedCache(COMPRESSED_CACHE_SIZE)
+
+# Files larger than this are hashed and archived a chunk at a time instead of read whole
+LARGE_FILE_SIZE = 1 << 20
+CHUNK_SIZE = 1 << 20
+
+# Data of a member that is compressed straight into the archive
+STREAMED = object()
+
+# The manifest of an archive is saved next to it
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+
+def get_compressor(method, level):
+    # (header, compressor) for data stored inside a zip file, no compressor for stored data
+    if method == 'DEFLATED':
+        return b'', zlib.compressobj(level, zlib.DEFLATED, -15)
+
+    elif method == 'LZMA':
+        # Zip files store the LZMA version and properties before the raw stream
+        dict_size = LZMA_DICT_SIZES[level]
+        props = struct.pack('<BI', (2 * 5 + 0) * 9 + 3, dict_size)
+        compressor = lzma.LZMACompressor(format=lzma.FORMAT_RAW,
+                                         filters=[{'id': lzma.FILTER_LZMA1, 'preset': level, 'dict_size': dict_size}])
+        return struct.pack('<BBH', 9, 4, len(props)) + props, compressor
+
+    return b'', None
+
+
+def compress_data(data, method, level):
+    # Compress data the way it is stored inside a zip file
+    header, compressor = get_compressor(method, level)
+    if compressor is None:
+        return data
+
+    return header + compressor.compress(data) + compressor.flush()
+
+
+def stream_member(source, out, method, level, task):
+    # Compress a large file into out a chunk at a time
+    # Returns (size, crc, compressed size)
+    header, compressor = get_compressor(method, level)
+    out.write(header)
+    written = len(header)
+    size = 0
+    crc = 0
+
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            if task.cancelled:
+                raise Cancelled()
+            size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            if compressor:
+                chunk = compressor.compress(chunk)
+            out.write(chunk)
+            written += len(chunk)
+
+    if compressor:
+        chunk = compressor.flush()
+        out.write(chunk)
+        written += len(chunk)
+
+    return size, crc & 0xffffffff, written
+
+
+def compress_member(source, method, level, previous=None, record=None):
+    # Read and compress a file, reusing the cached result for unchanged content
+    # Returns (size, crc, compressed data, sha1, cached), with no data if the content matches
+    # the previous manifest entry, whose data can be copied from the old archive instead.
+    # Large files are only hashed here, their data is STREAMED into the archive by the writer
+    # With the file's FileRecord, a hash it already has saves reading the file, and a new one is kept in it
+    # Runs in a worker thread, zlib and lzma release the GIL while compressing
+    size = record.size if record else os.path.getsize(source)
+    if record and record.hash and previous and previous['sha1'] == record.hash:
+        return size, previous['crc'], None, record.hash, True
+
+    if size > LARGE_FILE_SIZE:
+        sha1 = (record and record.hash) or hash_file(source)
+        if record:
+            record.hash = sha1
+        if previous and previous['sha1'] == sha1:
+            return size, previous['crc'], None, sha1, True
+        return size, None, STREAMED, sha1, False
+
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    sha1 = hashlib.sha1(data).hexdigest()
+    if record:
+        record.hash = sha1
+    if previous and previous['sha1'] == sha1:
+        return len(data), previous['crc'], None, sha1, True
+
+    key = (sha1, method, level)
+    cached = compressed_cache.get(key)
+    if cached:
+        return len(data), cached[0], cached[1], sha1, True
+
+    crc = zlib.crc32(data) & 0xffffffff
+    blob = compress_data(data, method, level)
+
+    if method != 'STORED':
+        compressed_cache.put(key, crc, blob)
+
+    return len(data), crc, blob, sha1, False
+
+
+def dos_time(mtime):
+    # Zip files store times with a two second resolution from 1980
+    t = time.gmtime(max(mtime, 315532800))
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+def archive_time():
+    # Every member gets the same time, so the same files always make the same archive
+    # SOURCE_DATE_EPOCH is the usual way to pick another fixed time for reproducible builds
+    try:
+        return dos_time(int(os.environ.get('SOURCE_DATE_EPOCH', 0)))
+    except ValueError:
+        return dos_time(0)
+
+
+def archive_mode(mode):
+    # Permissions stored in the archive, only the executable bit is kept
+    return 0o100755 if mode & 0o111 else 0o100644
+
+
+def encode_name(arcname, flags):
+    # Zip names use forward slashes, with a flag marking UTF-8 names
+    name = arcname.replace(os.sep, '/')
+    try:
+        return name.encode('ascii'), flags
+    except UnicodeEncodeError:
+        return name.encode('utf-8'), flags | 0x800
+
+
+def read_manifest(filepath):
+    # The saved manifest of a file or archive, or None if there is no usable one
+    try:
+        with open(filepath, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(filepath, manifest):
+    temp = filepath + ".tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp, filepath)
+
+
+def copy_member(archive, entry, out):
+    # Copy the compressed data of a member of an archive written with this manifest entry
+    archive.seek(entry['offset'])
+    header = archive.read(30)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+
+    archive.seek(entry['offset'] + 30 + name_length + extra_length)
+    remaining = entry['compressed']
+    while remaining:
+        chunk = archive.read(min(remaining, CHUNK_SIZE))
+        if not chunk:
+            raise ValueError("Previous archive is truncated")
+        out.write(chunk)
+        remaining -= len(chunk)
+
+
+def build_archive(location, members, method='DEFLATED', level=6, task=None, table=None, pool=None):
+    # Write a zip file from a list of (source path, name in archive) and save its manifest
+    # With a FileTable, sources are file names relative to its project, and their stats and hashes
+    # come from the table instead of being read again
+    # Members are compressed in parallel and written in sorted order with normalized times and permissions.
+    # Members the previous manifest matches are copied from the old archive without recompressing,
+    # and nothing is written at all if every member matches
+    # A cancelled task stops the build and leaves the old archive as it was
+    task = task or Task()
+    task.total += 2 * len(members)
+    stats = ArchiveStats()
+    start = time.time()
+
+    number, version = ZIP_METHODS[method]
+    flags = 0x02 if method == 'LZMA' else 0
+    members = sorted(members, key=lambda m: m[1])
+    mod_time, mod_date = archive_time()
+
+    if len(members) > 0xffff:
+        raise ValueError("Too many files for a zip archive")
+
+    # The previous build is only usable if it still is the archive it describes
+    manifest_path = location + MANIFEST_SUFFIX
+    manifest = read_manifest(manifest_path)
+    previous = {}
+    try:
+        if manifest and (manifest['method'], manifest['level'], manifest['size']) == (method, level,
+                                                                                    os.path.getsize(location)):
+            previous = {entry['path']: entry for entry in manifest['members']}
+    except OSError:
+        pass
+
+    # Members whose size and mtime match the manifest aren't read at all
+    if table:
+        records = [table.stat(source) for source, arcname in members]
+        members = [(table.source(source), arcname) for source, arcname in members]
+    else:
+        records = [None] * len(members)
+
+    infos = []
+    for record, (source, arcname) in zip(records, members):
+        if record is None:
+            stat = os.stat(source)
+            infos.append((stat.st_size, stat.st_mtime, archive_mode(stat.st_mode)))
+        else:
+            infos.append((record.size, record.mtime, archive_mode(record.mode)))
+
+    names = [arcname.replace(os.sep, '/') for source, arcname in members]
+    sources = dict(zip(names, (source for source, arcname in members)))
+    known = [previous.get(name) for name in names]
+
+    def pack(i):
+        task.step()
+        entry = known[i]
+        if entry and (entry['size'], entry['mtime'], entry['mode']) == infos[i]:
+            return entry['size'], entry['crc'], None, entry['sha1'], True
+        return compress_member(members[i][0], method, level, entry, records[i])
+
+    results = parallel_map(pack, range(len(members)), pool)
+
+    entries = []
+    for name, info, (size, crc, blob, sha1, cached) in zip(names, infos, results):
+        entries.append({'path': name, 'size': size, 'mtime': info[1], 'mode': info[2], 'sha1': sha1, 'crc': crc})
+        stats.files += 1
+        stats.bytes_in += size
+
+    # Same content in the same order makes the same archive, so there is nothing to write
+    if (previous and len(previous) == len(entries) and all(r[2] is None for r in results)
+            and all(entry['mode'] == old['mode'] for entry, old in zip(entries, known))):
+        for entry, old in zip(entries, known):
+            entry['offset'], entry['compressed'] = old['offset'], old['compressed']
+
+        manifest['members'] = entries
+        write_manifest(manifest_path, manifest)
+
+        stats.skipped = True
+        stats.reused = stats.files
+        stats.bytes_out = manifest['size']
+        stats.seconds = time.time() - start
+        return stats
+
+    central = []
+    temp = location + ".tmp"
+    old = open(location, 'rb') if previous else None
+    try:
+        with open(temp, 'wb') as out:
+            for entry, old_entry, (size, crc, blob, sha1, cached) in zip(entries, known, results):
+                task.step()
+                name, name_flags = encode_name(entry['path'], flags)
+                offset = out.tell()
+                if blob is None:
+                    compressed = old_entry['compressed']
+                elif blob is STREAMED:
+                    compressed = 0
+                else:
+                    compressed = len(blob)
+
+                out.write(struct.pack('<IHHHHHIIIHH', 0x04034b50, version, name_flags, number, mod_time, mod_date,
+                                      crc or 0, compressed, size, len(name), 0))
+                out.write(name)
+
+                if blob is None:
+                    copy_member(old, old_entry, out)
+                    stats.reused += 1
+                elif blob is STREAMED:
+                    # Sizes and crc are only known afterwards, so the header is patched
+                    size, crc, compressed = stream_member(sources[entry['path']], out, method, level, task)
+                    end = out.tell()
+                    out.seek(offset + 14)
+                    out.write(struct.pack('<III', crc, compressed, size))
+                    out.seek(end)
+                    entry['crc'], entry['size'] = crc, size
+                else:
+                    out.write(blob)
+                    stats.cached += cached
+
+                if out.tell() > 0xffffffff:
+                    raise ValueError("Archive too large for a zip file")
+
+                central.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | version, version,
+                                           name_flags, number, mod_time, mod_date, crc, compressed, size,
+                                           len(name), 0, 0, 0, 0, entry['mode'] << 16, offset) + name)
+
+                entry['offset'] = offset
+                entry['compressed'] = compressed
+
+            directory = out.tell()
+            for record in central:
+                out.write(record)
+
+            out.write(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, len(central), len(central),
+                                  out.tell() - directory, directory, 0))
+            stats.bytes_out = out.tell()
+
+        if old:
+            old.close()
+            old = None
+        os.replace(temp, location)
+    finally:
+        if old:
+            old.close()
+        if os.path.exists(temp):
+            os.remove(temp)
+
+    write_manifest(manifest_path, {'version': MANIFEST_VERSION, 'method': method, 'level': level,
+                                   'size': stats.bytes_out, 'members': entries})
+
+    stats.seconds = time.time() - start
+    return stats
+
+
+def verify_manifest(manifest, folder, content=False):
+    # Paths in the manifest whose file in folder is missing or differs
+    # Sizes are always compared, contents only when content is True
+    problems = []
+    for entry in manifest['members']:
+        filepath = os.path.join(folder, *entry['path'].split('/'))
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            problems.append(entry['path'])
+            continue
+
+        if size != entry['size'] or (content and hash_file(filepath) != entry['sha1']):
+            problems.append(entry['path'])
+
+    return problems
+
+
+def zip_project(location, files, path, name, method='STORED', level=6, task=None, table=None, pool=None):
+    # Saves specified folder (or single file) to specified location as a zip file
+    # With the project's FileTable, members are its file names and their stats and hashes are reused
+    if table:
+        members = [(file, name + os.sep + file if name else file) for file in files]
+    elif os.path.isdir(path):
+        members = [(os.path.join(path, file), name + os.sep + file) for file in files]
+    else:
+        members = [(path, file) for file in files]
+
+    return build_archive(location, members, method, level, task, table, pool)
+
+
+def export_project(path, files, filepath, method='DEFLATED', level=6, task=None, table=None, pool=None):
+    # Zip a project for distribution, a package goes in a folder named after it
+    if os.path.isdir(path):
+        name = os.path.basename(path.rstrip(os.sep))
+    elif os.path.isfile(path):
+        name = ""
+    else:
+        raise OSError("Project location does not exist")
+
+    return zip_project(filepath, files, path, name, method, level, task, table, pool)
+
+
+def get_addon_name(path):
+    # The module name of the addon at path
+    if os.path.isdir(path):
+        return os.path.basename(path.rstrip(os.sep))
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def hash_file(path):
+    # Content hash of a file
+    # Large files are mapped instead of read, so they are hashed without copying them into memory
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size > LARGE_FILE_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha.update(mapped)
+        else:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+
+    return sha.hexdigest()
+
+
+# (Project path, target folder) -> {relative path: hash} of the files copied there
+sync_states = {}
+
+
+def sync_project(table, files, target, task=None):
+    # Copy the files of a project whose content changed into target
+    # Returns the relative paths that were copied or removed
+    # If the task is cancelled the state isn't saved, so the next sync checks every file again
+    task = task or Task()
+    task.total += len(files)
+    state = sync_states.get((table.path, target), {})
+    changed = []
+    synced = {}
+
+    for file in files:
+        task.step()
+        destination = os.path.join(target, file)
+
+        # The file table only hashes files whose stat changed
+        digest = table.hash(file)
+        old = state.get(file)
+        if old:
+            copy = old != digest or not os.path.exists(destination)
+        else:
+            # First sync this session, compare with what is already installed
+            copy = not os.path.isfile(destination) or hash_file(destination) != digest
+
+        if copy:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(table.source(file), destination)
+            changed.append(file)
+        synced[file] = digest
+
+    # Remove files that were deleted from the project
+    for file in state:
+        if file not in synced:
+            try:
+                os.remove(os.path.join(target, file))
+            except OSError:
+                pass
+            changed.append(file)
+
+    sync_states[(table.path, target)] = synced
+    return changed
+
+
+def install_changes(table, files, target):
+    # Files whose content differs from the copy in target, and files removed from the project since
+    # Compared with the hashes remembered by the last install or sync, the first time this session with the
+    # installed files themselves
+    # Returns the changed files and the hashes to remember in sync_states once the install succeeded
+    state = sync_states.get((table.path, target))
+    changed = []
+    installed = {}
+
+    for file in files:
+        digest = table.hash(file)
+        if state is not None:
+            old = state.get(file)
+        else:
+            destination = os.path.join(target, file)
+            old = hash_file(destination) if os.path.isfile(destination) else None
+
+        if old != digest:
+            changed.append(file)
+        installed[file] = digest
+
+    changed.extend(file for file in state or () if file not in installed)
+    return changed, installed
+
+
+def install_project(path, files, addons, task=None):
+    # Copy a project into the addons folder without an archive in between
+    # Packages are copied next to the installed one and swapped in with renames,
+    # so a failed install never leaves a half copied addon behind
+    # Returns True if the addon wasn't installed before
+    # A cancelled task stops before the swap and leaves the installed copy as it was
+    task = task or Task()
+    task.total += len(files)
+    name = get_addon_name(path)
+
+    if not os.path.isdir(path):
+        target = os.path.join(addons, os.path.basename(path))
+        new = not os.path.exists(target)
+        task.step(len(files))
+        shutil.copyfile(path, target + ".adt-new")
+        os.replace(target + ".adt-new", target)
+        return new
+
+    # Blender skips folders with a dot in their name when looking for addons
+    target = os.path.join(addons, name)
+    staging = os.path.join(addons, "." + name + ".adt-new")
+    old = os.path.join(addons, "." + name + ".adt-old")
+    new = not os.path.exists(target)
+
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+    try:
+        for file in files:
+            task.step()
+            destination = os.path.join(staging, file)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(os.path.join(path, file), destination)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if not new:
+        os.rename(target, old)
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # Put the old copy back
+        if not new:
+            os.rename(old, target)
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    shutil.rmtree(old, ignore_errors=True)
+    return new
+
+
+# Written into installed addon folders
+FINGERPRINT_FILE = ".adt_fingerprint"
+
+
+def project_fingerprint(table, files, content=False):
+    # Hash of the path, size and mtime of every project file, or of their contents
+    sha = hashlib.sha1()
+    for file in sorted(files):
+        sha.update(file.encode('utf-8', 'surrogateescape'))
+
+        if content:
+            sha.update(table.hash(file).encode('ascii'))
+        else:
+            record = table.stat(file)
+            sha.update(struct.pack('<dq', record.mtime, record.size))
+
+    return sha.hexdigest()
+
+
+def read_fingerprint(folder):
+    # The fingerprint recorded in an installed addon folder, or None
+    try:
+        with open(os.path.join(folder, FINGERPRINT_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_fingerprint(folder, fingerprint):
+    with open(os.path.join(folder, FINGERPRINT_FILE), 'w') as f:
+        f.write(fingerprint)
+
+
+def get_module_name(addon_name, file):
+    # Module name of a relative .py path inside the addon
+    parts = os.path.splitext(file)[0].split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+
+    return ".".join([addon_name] + parts)
+
+
+# Absolute .py path -> ((mtime, size), names it imports)
+import_cache = {}
+
+
+def parse_imports(filepath, module_name, is_package):
+    # (module, name) for everything a module imports, relative imports resolved
+    # name is what "from module import name" imports, None for plain imports
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return frozenset()
+
+    key = (stat.st_mtime, stat.st_size)
+    cached = import_cache.get(filepath)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    try:
+        with open(filepath, 'rb') as f:
+            tree = ast.parse(f.read(), filepath)
+    except (SyntaxError, ValueError):
+        tree = None
+
+    package = module_name if is_package else module_name.rpartition('.')[0]
+    names = set()
+
+    for node in ast.walk(tree) if tree else ():
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.add((alias.name, None))
+
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split('.')
+                if node.level > 1:
+                    parts = parts[:1 - node.level]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = node.module
+
+            for alias in node.names:
+                names.add((base, alias.name))
+
+    imports = frozenset(names)
+    import_cache[filepath] = (key, imports)
+    return imports
+
+
+def import_graph(path, files, addon_name):
+    # Module name -> the modules of the same addon it imports
+    modules = {}
+    for file in files:
+        if file.endswith('.py'):
+            modules[get_module_name(addon_name, file)] = file
+
+    graph = {}
+    for name, file in modules.items():
+        imports = parse_imports(os.path.join(path, file), name, file.endswith('__init__.py'))
+
+        # "from a import b" depends on the submodule a.b if there is one, otherwise on a
+        depends = set()
+        for base, imported in imports:
+            if imported and base + "." + imported in modules:
+                depends.add(base + "." + imported)
+            else:
+                depends.add(base)
+
+        depends.discard(name)
+        graph[name] = depends.intersection(modules)
+
+    return graph
+
+
+def affected_modules(graph, changed):
+    # The changed modules and every module that imports them, directly or not
+    dependents = {}
+    for name, depends in graph.items():
+        for depend in depends:
+            dependents.setdefault(depend, set()).add(name)
+
+    affected = set(changed)
+    queue = deque(affected)
+    while queue:
+        for name in dependents.get(queue.popleft(), ()):
+            if name not in affected:
+                affected.add(name)
+                queue.append(name)
+
+    return affected
+
+
+def reload_order(graph, modules):
+    # Modules ordered so everything is reloaded after what it imports
+    # Import cycles are broken in name order
+    remaining = {name: set(graph.get(name, ())).intersection(modules) for name in modules}
+    order = []
+
+    while remaining:
+        ready = sorted(name for name, depends in remaining.items() if not depends)
+        if not ready:
+            ready = [min(remaining)]
+
+        for name in ready:
+            del remaining[name]
+            order.append(name)
+        for depends in remaining.values():
+            depends.difference_update(ready)
+
+    return order
+
+
+def reload_addon(addon_name, changed_files, path, files):
+    # Reload the changed modules of an enabled addon and the ones depending on them, then register it again
+    # Returns (module name, seconds) for every reloaded module
+    changed = set(get_module_name(addon_name, f) for f in changed_files if f.endswith('.py'))
+
+    if os.path.isdir(path):
+        graph = import_graph(path, files, addon_name)
+    else:
+        graph = {}
+
+    order = reload_order(graph, affected_modules(graph, changed))
+
+    # The addon is always reloaded last so register() sees the new modules
+    if addon_name in order:
+        order.remove(addon_name)
+    order.append(addon_name)
+
+    addon = sys.modules[addon_name]
+    addon.unregister()
+
+    timings = []
+    for name in order:
+        module = sys.modules.get(name)
+        if module:
+            start = time.perf_counter()
+            module = importlib.reload(module)
+            timings.append((name, time.perf_counter() - start))
+
+    sys.modules[addon_name].register()
+    return timings
+
+
+class BatchResult:
+    """ How one project did in a batch operation """
+
+    def __init__(self, name):
+        self.name = name
+        self.ok = True
+        self.message = ""
+        self.value = None
+        self.seconds = 0.0
+
+
+def batch_pool():
+    # The pool batch jobs share for their own parallel work, like compiling and compressing
+    # It has to be another pool than the one running the jobs, which wait for it
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+
+def duplicate_outputs(outputs):
+    # (path, names) for every output path more than one of the (name, path) pairs would write
+    names = {}
+    for name, path in outputs:
+        names.setdefault(os.path.normcase(os.path.abspath(path)), []).append(name)
+
+    return sorted((path, found) for path, found in names.items() if len(found) > 1)
+
+
+def run_batch(jobs):
+    # Run (name, function, args) jobs in a thread pool, in order of the jobs
+    # A job that raises is recorded as failed and the others carry on
+    def run(job):
+        name, func, args = job
+        result = BatchResult(name)
+        start = time.perf_counter()
+        try:
+            result.value = func(*args)
+        except Exception as e:
+            result.ok = False
+            result.message = "{0}: {1}".format(type(e).__name__, e)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        return list(pool.map(run, jobs))
+
+
+def batch_report(action, results, seconds):
+    # Lines summarizing a batch operation, one per project
+    failed = [r for r in results if not r.ok]
+    lines = ["{0} {1} projects in {2:.0f} ms, {3} failed".format(action, len(results), seconds * 1000,
+                                                                 len(failed))]
+    for result in results:
+        lines.append("  {0:<30} {1:>8.1f} ms  {2}{3}".format(result.name, result.seconds * 1000,
+                                                             "ok" if result.ok else "FAILED",
+                                                             "  " + result.message if result.message else ""))
+    return lines
+
+
+class MemoryPeak:
+    """ Measures the peak Python memory use of a with block """
+
+    # Tracing slows down allocations, so it only runs while there are blocks measuring.
+    # Blocks of overlapping operators share it, the last one to end stops it
+    blocks = 0
+    started = False
+    lock = threading.Lock()
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.peak = 0
+
+    def __enter__(self):
+        if self.enabled:
+            with MemoryPeak.lock:
+                if MemoryPeak.blocks == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    MemoryPeak.started = True
+                MemoryPeak.blocks += 1
+            self.base = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc):
+        if self.enabled:
+            with MemoryPeak.lock:
+                # The peak is of the shared trace, so it can include an overlapping block's
+                self.peak = max(0, tracemalloc.get_traced_memory()[1] - self.base)
+                MemoryPeak.blocks -= 1
+                if MemoryPeak.blocks == 0 and MemoryPeak.started:
+                    tracemalloc.stop()
+                    MemoryPeak.started = False
+
+    def __str__(self):
+        return "peak memory {0:.1f} MB".format(self.peak / (1 << 20))
+
+
+def percentile(ordered, percent):
+    # Nearest rank percentile of a sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Profiler:
+    """ Rolling timings of wrapped functions, plus an optional cProfile recording """
+
+    def __init__(self, size=200):
+        self.enabled = False
+
+        # Name -> the last size timings in seconds, and how often it was called
+        self.size = size
+        self.samples = {}
+        self.counts = {}
+
+        self.profile = None
+
+    def add(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.size)
+            self.counts[name] = 0
+
+        samples.append(seconds)
+        self.counts[name] += 1
+
+    def call(self, name, func, *args):
+        if not self.enabled:
+            return func(*args)
+
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def wrap(self, name, func):
+        # Time every call to func while enabled
+        # Blender checks the argument count of operator and handler functions,
+        # so the wrapper has to take exactly the same arguments
+        call = self.call
+        count = func.__code__.co_argcount
+
+        if count == 1:
+            def timed(a):
+                return call(name, func, a)
+        elif count == 2:
+            def timed(a, b):
+                return call(name, func, a, b)
+        elif count == 3:
+            def timed(a, b, c):
+                return call(name, func, a, b, c)
+        else:
+            return func
+
+        return functools.update_wrapper(timed, func)
+
+    def stats(self):
+        # (name, count, p50, p95, max) for every wrapped function, slowest first
+        rows = []
+        for name, samples in self.samples.items():
+            ordered = sorted(samples)
+            rows.append((name, self.counts[name], percentile(ordered, 50), percentile(ordered, 95), ordered[-1]))
+
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+    def clear(self):
+        self.samples.clear()
+        self.counts.clear()
+
+    def dump(self, filepath):
+        # Write the timings as JSON, in milliseconds
+        rows = [{"name": name, "count": count, "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "max_ms": longest * 1000}
+                for name, count, p50, p95, longest in self.stats()]
+
+        with open(filepath, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+    def start_recording(self):
+        # Record everything Python runs with cProfile until stop_recording
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop_recording(self, filepath):
+        # Save the recording for pstats, snakeviz and friends
+        self.profile.disable()
+        self.profile.dump_stats(filepath)
+        self.profile = None
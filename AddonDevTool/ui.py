@@ -0,0 +1,2070 @@
+'''
+Addon Development Tool
+Copyright 2015 Nathan Craddock
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+'''
+
+import bpy
+from bpy.types import Panel, AddonPreferences, PropertyGroup, UIList, Operator
+from bpy.props import StringProperty, CollectionProperty, IntProperty, BoolProperty, FloatProperty, EnumProperty
+from bpy_extras.io_utils import ImportHelper, ExportHelper
+from bpy.app.handlers import persistent
+
+import os
+import sys
+import time
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+
+from .core import (PROJECT_FIELDS, new_project_id, ProjectStore, FileIndex, FileWatcher, file_indexes, get_file_index,
+                   read_projects, validate_project, get_addon_name, sync_project, sync_states, reload_addon, Profiler,
+                   project_fingerprint, read_fingerprint, write_fingerprint, install_project, ProjectStatus, run_batch,
+                   batch_report, export_project, MemoryPeak, Task, check_syntax, get_file_table, read_index_cache,
+                   write_index_cache, batch_pool, duplicate_outputs, install_changes)
+
+
+#######################################################################################
+# FUNCTIONS
+#######################################################################################
+
+project_store = ProjectStore()
+profiler = Profiler()
+
+
+def get_projects_file():
+    return bpy.utils.script_path_user() + os.sep + "ADTProjects.json"
+
+
+def get_index_cache_file():
+    # The file indexes of the projects are cached next to the project list
+    return bpy.utils.script_path_user() + os.sep + "ADTFileIndex.json"
+
+
+# Project id -> file index snapshot from the cache, for projects whose index wasn't needed yet
+index_snapshots = {}
+
+# Project id -> path of the file index it last used, so the cache can be written without the project list
+index_paths = {}
+
+# What the index cache was last written from, it is only written again when an index changed
+index_cache_key = [None]
+
+
+def get_preferences():
+    addon = bpy.context.user_preferences.addons.get(__package__)
+    if addon:
+        return addon.preferences
+
+
+def project_changed(self, context):
+    # Update callback for the project properties
+    project_store.mark_changed()
+    status = project_statuses.get(self.uid)
+    if status:
+        status.dirty = True
+
+
+def add_project(project_list):
+    # Add a project with a new id to the list
+    project = project_list.add()
+    project.uid = new_project_id()
+    project_store.mark_changed()
+
+    return project
+
+
+@persistent
+def get_projects(dummy):
+    # Merge the projects from the JSON file into the scene's project list
+    scene = bpy.context.scene
+    project_list = scene.project_list
+
+    project_store.reset()
+
+    # Projects from blend files saved before projects had ids
+    for project in project_list:
+        if not project.uid:
+            project.uid = new_project_id()
+
+    known = set(p.uid for p in project_list) | set(p.location for p in project_list)
+    projects = read_projects(get_projects_file())
+    project_store.load(dict(projects))
+
+    # Registries from before the cache kept the snapshots with the projects, they move to the cache
+    index_snapshots.clear()
+    index_snapshots.update(read_index_cache(get_index_cache_file()))
+    index_cache_key[0] = None
+    for uid, record in projects:
+        snapshot = project_store.take_meta(uid, 'files')
+        if snapshot:
+            index_snapshots.setdefault(uid, snapshot)
+            project_store.mark_changed()
+
+    added = False
+    for uid, record in projects:
+        if uid in known or record.get('location') in known:
+            continue
+
+        project = project_list.add()
+        project.uid = uid
+        for field in PROJECT_FIELDS:
+            if field in record:
+                setattr(project, field, record[field])
+        added = True
+
+    if added:
+        scene.project_list_index = len(project_list) - 1
+
+
+@persistent
+def save_projects(dummy):
+    # Save project list to a JSON file when it has changed
+    prefs = get_preferences()
+    if prefs:
+        project_store.debounce = prefs.save_delay
+        profiler.enabled = prefs.profile
+
+    project_store.update(bpy.context.scene.project_list)
+    project_store.save(get_projects_file())
+
+
+def save_index_cache(uids):
+    # Write the file indexes of the given projects, so the next session only rescans changed folders
+    # Projects that weren't used this session keep the snapshot they had
+    indexes = [(uid, file_indexes.get(path)) for uid, path in index_paths.items() if uid in uids]
+    indexes = [(uid, index) for uid, index in indexes if index and index.folders]
+
+    key = (frozenset(uids), tuple(sorted((uid, id(index), index.generation) for uid, index in indexes)))
+    if key == index_cache_key[0]:
+        return
+    index_cache_key[0] = key
+
+    for uid, index in indexes:
+        index_snapshots[uid] = index.snapshot()
+
+    snapshots = {uid: snapshot for uid, snapshot in index_snapshots.items() if uid in uids}
+    if snapshots:
+        write_index_cache(get_index_cache_file(), snapshots)
+
+
+def write_projects():
+    # Write the sessions and file indexes kept in memory along with the project list last seen by save_projects
+    # Blender neither unregisters addons nor loads a file when it quits, and its data is freed
+    # by the time atexit handlers run, so this is registered with atexit and never touches bpy.context
+    for uid, session in sessions.items():
+        project_store.set_meta(uid, 'session', session)
+    sessions.clear()
+
+    save_index_cache(set(record['id'] for record in project_store.projects or ()))
+
+    project_store.serialize()
+    project_store.save(get_projects_file(), force=True)
+
+
+@persistent
+def flush_projects(dummy):
+    # Write any changes still waiting on the debounce window, when loading or saving a blend file,
+    # with the session of the active project
+    scene = bpy.context.scene
+    if bpy.context.screen and 0 <= scene.project_list_index < len(scene.project_list):
+        save_session(bpy.context, scene.project_list[scene.project_list_index])
+
+    project_store.update(bpy.context.scene.project_list)
+    write_projects()
+
+
+def get_project_index(project):
+    # The file index of a project, using its ignore patterns
+    patterns = tuple(p.strip() for p in project.ignore.split(',') if p.strip())
+    path = bpy.path.abspath(project.location)
+
+    # Start from the cached snapshot, which isn't kept around after that
+    # since write_projects saves a new one from the index
+    index_paths[project.uid] = path
+    if path not in file_indexes:
+        snapshot = index_snapshots.pop(project.uid, None)
+        if snapshot:
+            file_indexes[path] = FileIndex(path, patterns, project.use_gitignore)
+            file_indexes[path].restore(snapshot)
+
+    return get_file_index(path, patterns, project.use_gitignore)
+
+
+def get_project_table(project):
+    # The file table of a project, shared by everything that hashes or stats its files
+    return get_file_table(project.uid, get_project_index(project))
+
+
+def get_files(context, ending=""):
+    # Return the paths of the files from the current project, relative to the project location
+    project = context.scene.project_list[context.scene.project_list_index]
+
+    return get_project_index(project).files(ending)
+
+
+file_watcher = FileWatcher()
+
+# Runs the file work of modal operators
+task_pool = None
+
+
+def get_task_pool():
+    global task_pool
+    if task_pool is None:
+        task_pool = ThreadPoolExecutor(max_workers=2)
+    return task_pool
+
+
+def stop_task_pool():
+    # Wait for running tasks, they stop early when their operator was cancelled
+    global task_pool
+    if task_pool is not None:
+        task_pool.shutdown()
+        task_pool = None
+
+
+# Project id -> Task of the modal operator working on that project
+running_tasks = {}
+
+
+def is_task_running(context):
+    # Whether a modal operator is still working on the active project
+    scene = context.scene
+    if not 0 <= scene.project_list_index < len(scene.project_list):
+        return False
+    return scene.project_list[scene.project_list_index].uid in running_tasks
+
+
+@persistent
+def cancel_tasks(dummy):
+    # Loading another blend file drops the modal operators, stop what they left running in the pool
+    for task in running_tasks.values():
+        task.cancel()
+    running_tasks.clear()
+
+# Number of texts reloaded each time the watcher queue is drained
+RELOAD_BATCH = 10
+
+
+def text_path(text):
+    # Normalized absolute path of the file of a text, or "" if it has none
+    if not text.filepath:
+        return ""
+    return os.path.normpath(bpy.path.abspath(text.filepath))
+
+
+def text_file(text):
+    # The file a text was loaded from or a placeholder stands in for, or "" if it has none
+    return text_path(text) or text.get(PLACEHOLDER_KEY, "")
+
+
+class TextIndex:
+    """ Maps normalized absolute file paths to the names of the texts loaded from them """
+
+    # Paths are only case folded to look them up, texts are loaded and shown with the path as it is
+
+    def __init__(self):
+        self.names = {}
+        self.count = -1
+        self.built = 0.0
+
+        # Bumped whenever the mapping changes
+        self.generation = 0
+
+    def reset(self):
+        self.count = -1
+
+    def refresh(self):
+        # Rebuild when texts were opened or closed, and now and then to catch renamed or resaved texts
+        if len(bpy.data.texts) != self.count or time.time() - self.built > FileIndex.rescan_interval:
+            self.rebuild()
+
+    def rebuild(self):
+        names = {}
+        for text in bpy.data.texts:
+            path = text_file(text)
+            if path:
+                names[os.path.normcase(path)] = text.name
+
+        self.count = len(bpy.data.texts)
+        self.built = time.time()
+        if names != self.names:
+            self.names = names
+            self.generation += 1
+
+    def get(self, path):
+        # The text loaded from path, or None
+        name = self.names.get(os.path.normcase(path))
+        return bpy.data.texts.get(name) if name is not None else None
+
+    def __contains__(self, path):
+        return os.path.normcase(path) in self.names
+
+
+text_index = TextIndex()
+
+
+def get_project_texts(context, ending='.py'):
+    # Return the open texts of the current project's files
+    text_index.refresh()
+    texts = (text_index.get(path) for path in get_project_paths(context, ending) if path in text_index)
+    return [text for text in texts if text is not None]
+
+
+def get_unopened(project):
+    # Sorted paths of the project's .py files that aren't open
+    text_index.refresh()
+    return tuple(sorted(p for p in get_project_index(project).paths('.py') if p not in text_index))
+
+
+# Project id -> ProjectStatus
+project_statuses = {}
+
+# Project id -> compile errors from the last pre-flight check
+preflight_errors = {}
+
+# Seconds between updates of the active project's status
+STATUS_INTERVAL = 0.5
+
+
+def update_status(context, project):
+    # Check everything the panel shows about a project, this is the only place draw and polls touch the disk
+    status = project_statuses.get(project.uid) or ProjectStatus()
+    path = bpy.path.abspath(project.location)
+
+    status.exists = project.location != "" and os.path.exists(path)
+    status.is_folder = os.path.isdir(path)
+    status.installed = get_addon_name(path) in context.user_preferences.addons
+    status.fingerprint = project_store.get_meta(project.uid, 'install_fingerprint')
+    status.compile_errors = preflight_errors.get(project.uid, [])
+
+    if status.exists:
+        # Scripts have no bl_info to check
+        if project.is_addon:
+            info = validate_project(path, tuple(bpy.app.version))
+            status.messages = info.messages
+            status.bl_info = info.bl_info
+        else:
+            status.messages = []
+            status.bl_info = None
+
+        index = get_project_index(project)
+        text_index.refresh()
+
+        # Only recount open files when the project files or the open texts changed
+        key = (path, index.generation, text_index.generation)
+        if status.open_key != key:
+            status.open_key = key
+            status.file_count = len(index.files())
+            status.unopened = get_unopened(project)
+            status.opened = len(index.paths('.py')) - len(status.unopened)
+    else:
+        status.messages = []
+        status.bl_info = None
+        status.file_count = status.opened = 0
+        status.unopened = ()
+
+    status.dirty = False
+    status.updated = time.time()
+    project_statuses[project.uid] = status
+    return status
+
+
+def get_status(context):
+    # Status of the active project, or None if there isn't one
+    # Never touches the disk, a project without a status yet gets an empty one for update_statuses to fill in
+    scene = context.scene
+    if not 0 <= scene.project_list_index < len(scene.project_list):
+        return None
+
+    project = scene.project_list[scene.project_list_index]
+    status = project_statuses.get(project.uid)
+    if status is None:
+        status = project_statuses[project.uid] = ProjectStatus()
+
+    return status
+
+
+def invalidate_status(context, projects=None):
+    # Have update_statuses check the given projects again, the active one by default
+    # Their old status is still shown until then
+    if projects is None:
+        scene = context.scene
+        if not 0 <= scene.project_list_index < len(scene.project_list):
+            return
+        projects = [scene.project_list[scene.project_list_index]]
+
+    for project in projects:
+        status = project_statuses.get(project.uid)
+        if status:
+            status.dirty = True
+
+
+def status_shown(status):
+    # The parts of a status the panel shows
+    return (status.updated > 0, status.exists, status.is_folder, status.messages, status.file_count, status.opened,
+            status.unopened, status.installed, status.fingerprint, status.compile_errors)
+
+
+def redraw_text_editors(context):
+    # Show a changed status, the panel isn't redrawn on its own when nothing happens in the editor
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'TEXT_EDITOR':
+                area.tag_redraw()
+
+
+@persistent
+def update_statuses(dummy):
+    # Keep the active project's status up to date
+    context = bpy.context
+    scene = context.scene
+    if 0 <= scene.project_list_index < len(scene.project_list):
+        project = scene.project_list[scene.project_list_index]
+        status = project_statuses.get(project.uid)
+
+        if status is None or status.dirty or time.time() - status.updated >= STATUS_INTERVAL:
+            shown = status_shown(status) if status else None
+            status = update_status(context, project)
+
+            if status_shown(status) != shown:
+                redraw_text_editors(context)
+
+
+# Custom property holding the path of the file a placeholder text stands in for
+PLACEHOLDER_KEY = 'adt_placeholder'
+
+# Custom property of the placeholders restore_session opens for files that aren't shown yet,
+# holding the cursor to put back once load_shown_texts loads the file
+LAZY_KEY = 'adt_lazy'
+
+
+def get_large_file_size():
+    # Files over this many bytes are opened as placeholders, 0 loads everything
+    prefs = get_preferences()
+    if prefs is None:
+        return 0
+    return prefs.large_file_size * 1024 if prefs.skip_large_files else 0
+
+
+def load_placeholder(path, size):
+    # A short text standing in for a file too large to load into the text editor
+    text = bpy.data.texts.new(os.path.basename(path))
+    text.write("# {0}\n# {1:.1f} MB, too large to load into the text editor\n".format(path, size / (1 << 20)))
+    text[PLACEHOLDER_KEY] = path
+    return text
+
+
+def load_lazy_placeholder(path, line, character):
+    # A short text standing in for a session file until an editor shows it
+    text = bpy.data.texts.new(os.path.basename(path))
+    text.write("# {0}\n# Loaded when shown in the text editor\n".format(path))
+    text[PLACEHOLDER_KEY] = path
+    text[LAZY_KEY] = [line, character]
+    return text
+
+
+def set_cursor(text, line, character):
+    # Put the cursor of a text back where it was, as far as the text still reaches
+    text.current_line_index = min(line, len(text.lines) - 1)
+    text.current_character = min(character, len(text.current_line.body))
+
+
+def open_texts(paths, missing=None):
+    # Load files straight into texts, skipping files that are already open
+    # Files that no longer exist are skipped too, and added to missing if it is given
+    text_index.refresh()
+    limit = get_large_file_size()
+
+    loaded = []
+    for path in paths:
+        if path not in text_index:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                if missing is not None:
+                    missing.append(path)
+                continue
+
+            if limit and size > limit:
+                loaded.append(load_placeholder(path, size))
+            else:
+                loaded.append(bpy.data.texts.load(path))
+
+    text_index.rebuild()
+    return loaded
+
+
+def show_text(context, text):
+    # Make text the active text of the first text editor
+    for area in context.screen.areas:
+        if area.type == 'TEXT_EDITOR':
+            area.spaces.active.text = text
+            break
+
+
+@persistent
+def reset_text_index(dummy):
+    text_index.reset()
+
+
+def text_editor(context):
+    # The first text editor on the screen and its main region, or (None, None)
+    for area in context.screen.areas if context.screen else ():
+        if area.type == 'TEXT_EDITOR':
+            for region in area.regions:
+                if region.type == 'WINDOW':
+                    return area, region
+
+    return None, None
+
+
+def reload_text(text):
+    # Load external changes into a text without making it the active text of an editor
+    # Reloading keeps the scroll position of a text editor, so it needs one, returns False if there is none
+    area, region = text_editor(bpy.context)
+    if area is None:
+        return False
+
+    override = bpy.context.copy()
+    override['edit_text'] = text
+    override['area'] = area
+    override['region'] = region
+    override['space_data'] = area.spaces.active
+
+    bpy.ops.text.reload(override)
+    return True
+
+
+@persistent
+def apply_file_changes(dummy):
+    # Reload texts changed on disk, in small batches on the main thread
+    prefs = get_preferences()
+    if prefs is None or not prefs.watch_files:
+        file_watcher.stop()
+        return
+
+    file_watcher.interval = prefs.watch_interval
+    file_watcher.start()
+
+    scene = bpy.context.scene
+    if time.time() - file_watcher.updated >= file_watcher.interval:
+        if 0 <= scene.project_list_index < len(scene.project_list):
+            file_watcher.watch(text_path(text) for text in get_project_texts(bpy.context) if text.filepath)
+        else:
+            file_watcher.watch(())
+
+    # Changes stay queued until there is a text editor to reload them in
+    if text_editor(bpy.context)[0] is None:
+        return
+
+    batch = file_watcher.take(RELOAD_BATCH)
+    if batch:
+        text_index.refresh()
+        for path in batch:
+            text = text_index.get(path)
+
+            # Never throw away edits made in Blender, and texts saved from Blender are already up to date
+            if text and text.filepath and text.is_modified and not text.is_dirty:
+                reload_text(text)
+
+
+# Id of the active project whose session is being kept, None until track_session sees one,
+# and when its session was last saved
+active_session = [None, 0.0]
+
+# Seconds between saves of the active project's session, the one written if Blender quits
+SESSION_INTERVAL = 2.0
+
+# Project id -> session saved this session, only written to the registry by write_projects
+# since cursors and scroll positions change all the time
+sessions = {}
+
+
+def project_root(project):
+    # Normalized absolute location of a project, and the folder its relative paths start from
+    root = os.path.normpath(bpy.path.abspath(project.location))
+    return root, root if os.path.isdir(root) else os.path.dirname(root)
+
+
+def in_project(path, root, folder):
+    # Whether a normalized absolute path is the project file or inside the project folder
+    path, root, folder = os.path.normcase(path), os.path.normcase(root), os.path.normcase(folder)
+    return path == root or (root == folder and path.startswith(folder + os.sep))
+
+
+def get_session(context, project):
+    # The open texts of a project with their cursors, and the scroll position of the one shown,
+    # with paths relative to the project
+    root, folder = project_root(project)
+    text_index.refresh()
+
+    texts = []
+    for name in text_index.names.values():
+        text = bpy.data.texts.get(name)
+        path = text_file(text) if text else ""
+        if path and in_project(path, root, folder):
+            # Placeholders that were never shown keep the cursor the file had
+            line, character = text.get(LAZY_KEY) or (text.current_line_index, text.current_character)
+            texts.append([os.path.relpath(path, folder), line, character])
+
+    session = {'texts': sorted(texts), 'active': None, 'top': 0}
+
+    for area in context.screen.areas if context.screen else ():
+        if area.type == 'TEXT_EDITOR':
+            space = area.spaces.active
+            path = text_file(space.text) if space.text else ""
+            if path and in_project(path, root, folder):
+                session['active'] = os.path.relpath(path, folder)
+                session['top'] = space.top
+            break
+
+    return session
+
+
+def save_session(context, project):
+    # Remember the open texts of a project when it stops being active or its files are closed
+    # A project without open texts keeps the session it had, so closing its files doesn't forget them
+    prefs = get_preferences()
+    if prefs is None or not prefs.restore_session:
+        return
+
+    session = get_session(context, project)
+    if session['texts']:
+        sessions[project.uid] = session
+
+
+def get_saved_session(project):
+    # The last saved session of a project, or None
+    return sessions.get(project.uid) or project_store.get_meta(project.uid, 'session')
+
+
+def session_files(project, session):
+    # Normalized absolute path -> (line, character) of the session's files that still exist
+    root, folder = project_root(project)
+    files = {}
+    for rel, line, character in session['texts']:
+        path = os.path.normpath(os.path.join(folder, rel))
+        if os.path.isfile(path):
+            files[path] = (line, character)
+
+    return files
+
+
+def apply_session(context, project, session, files):
+    # Put the cursors of the session's open texts back and show the text that was shown
+    for path, (line, character) in files.items():
+        text = text_index.get(path)
+        if text and text.filepath:
+            set_cursor(text, line, character)
+
+    if session['active']:
+        root, folder = project_root(project)
+        text = text_index.get(os.path.normpath(os.path.join(folder, session['active'])))
+        if text:
+            show_text(context, text)
+            for area in context.screen.areas:
+                if area.type == 'TEXT_EDITOR':
+                    area.spaces.active.top = session['top']
+                    break
+
+
+def restore_session(context, project):
+    # Open the texts saved in the project's session again and put their cursors back
+    # Texts that are still loaded are reused, and only reloaded if the file changed and wasn't edited in Blender
+    # Only the text that was shown is loaded here, the others get placeholders that are loaded once shown
+    session = get_saved_session(project)
+    if not session:
+        return
+
+    root, folder = project_root(project)
+    files = session_files(project, session)
+
+    text_index.refresh()
+    for path in files:
+        text = text_index.get(path)
+        if text and text.filepath and text.is_modified and not text.is_dirty:
+            reload_text(text)
+
+    if session['active']:
+        active = os.path.normpath(os.path.join(folder, session['active']))
+        if active in files:
+            open_texts([active])
+
+    for path in sorted(files):
+        if path not in text_index:
+            load_lazy_placeholder(path, *files[path])
+    text_index.rebuild()
+
+    apply_session(context, project, session, files)
+
+
+def load_lazy_text(context, placeholder):
+    # Swap a session placeholder for the file it stands in for, in every editor showing it
+    path = placeholder[PLACEHOLDER_KEY]
+    line, character = placeholder[LAZY_KEY]
+    spaces = [area.spaces.active for area in context.screen.areas
+              if area.type == 'TEXT_EDITOR' and area.spaces.active.text == placeholder]
+
+    # Removed first, so the loaded text gets the file's name
+    bpy.data.texts.remove(placeholder)
+    text_index.rebuild()
+    loaded = open_texts([path])
+
+    if loaded and loaded[0].filepath:
+        set_cursor(loaded[0], line, character)
+    for space in spaces:
+        space.text = loaded[0] if loaded else next(iter(bpy.data.texts), None)
+
+
+@persistent
+def load_shown_texts(dummy):
+    # Load the files of session placeholders once a text editor shows them
+    context = bpy.context
+    if context.screen is None:
+        return
+
+    for area in context.screen.areas:
+        if area.type == 'TEXT_EDITOR':
+            text = area.spaces.active.text
+            if text is not None and text.get(LAZY_KEY) is not None:
+                load_lazy_text(context, text)
+
+
+@persistent
+def track_session(dummy):
+    # Save the session of the project that stopped being active and restore the one of the project now active
+    context = bpy.context
+    scene = context.scene
+    prefs = get_preferences()
+
+    if prefs is None or not prefs.restore_session or context.screen is None:
+        return
+
+    project = None
+    if 0 <= scene.project_list_index < len(scene.project_list):
+        project = scene.project_list[scene.project_list_index]
+
+    uid = project.uid if project else None
+    if uid == active_session[0]:
+        # Keep the session in memory up to date, there is no blend file to read it from when Blender quits
+        if project and time.time() - active_session[1] >= SESSION_INTERVAL:
+            active_session[1] = time.time()
+            save_session(context, project)
+        return
+
+    for previous in scene.project_list:
+        if previous.uid == active_session[0]:
+            save_session(context, previous)
+            break
+
+    active_session[0] = uid
+    active_session[1] = time.time()
+    if project:
+        restore_session(context, project)
+
+
+@persistent
+def reset_sessions(dummy):
+    # Restore the active project's session again in a newly loaded blend file
+    active_session[0] = None
+
+
+def get_project_paths(context, ending=""):
+    # Normalized absolute paths of the files from the current project
+    project = context.scene.project_list[context.scene.project_list_index]
+
+    return get_project_index(project).paths(ending)
+
+
+def hide_texts(context, names):
+    # Show one of the remaining texts in editors that show a text about to be closed
+    remaining = [text for text in bpy.data.texts if text.name not in names]
+
+    for area in context.screen.areas:
+        if area.type == 'TEXT_EDITOR':
+            space = area.spaces.active
+            if space.text is None or space.text.name in names:
+                space.text = remaining[0] if remaining else None
+
+
+def close_files(context, all):
+    # Closes files
+    # All will toggle between all files, or the files in the project
+    # Returns the number of closed files and the time it took
+    start = time.time()
+
+    if all:
+        closing = list(bpy.data.texts)
+    else:
+        closing = get_project_texts(context)
+
+    hide_texts(context, set(text.name for text in closing))
+
+    for text in closing:
+        bpy.data.texts.remove(text)
+    text_index.rebuild()
+
+    return len(closing), time.time() - start
+
+
+def get_selected_projects(context):
+    # Projects checked for batch operations, or the active project if none are
+    project_list = context.scene.project_list
+    projects = [p for p in project_list if p.selected]
+
+    if not projects and 0 <= context.scene.project_list_index < len(project_list):
+        projects = [project_list[context.scene.project_list_index]]
+
+    return projects
+
+
+def preflight(table, files, pool):
+    # Stop a batch job for a project whose scripts don't compile
+    errors = check_syntax(table, files, pool)
+    if errors:
+        raise SyntaxError("{0} scripts don't compile, {1}".format(len(errors), errors[0]))
+
+
+def validate_job(index, table, path, blender_version, is_addon, pool):
+    # Batch worker, walks and validates one project and compiles its scripts
+    # Returns (validation messages, compile errors), scripts only get compiled
+    index.refresh()
+    table.prune(index)
+    messages = validate_project(path, blender_version).messages if is_addon else []
+    errors = check_syntax(table, index.files(), pool) if os.path.exists(path) else []
+
+    return messages, errors
+
+
+def export_job(index, table, path, filepath, method, level, check, pool):
+    # Batch worker, walks and zips one project
+    if check and os.path.exists(path):
+        preflight(table, index.files(), pool)
+    return export_project(path, index.files(), filepath, method, level, table=table, pool=pool)
+
+
+def install_job(index, table, path, addons, method, content, installed, check, pool):
+    # Batch worker, copies one project into the addons folder
+    # Returns None if the installed fingerprint already matches, otherwise
+    # (fingerprint, changed files, whether the addon is new, project files)
+    if not os.path.exists(path):
+        raise OSError("Project location does not exist")
+
+    files = index.files()
+    fingerprint = project_fingerprint(table, files, content)
+    if installed == fingerprint:
+        return None
+
+    if check:
+        preflight(table, files, pool)
+
+    target = os.path.join(addons, get_addon_name(path))
+    new = not os.path.exists(target if os.path.isdir(path) else target + ".py")
+    folder = target if os.path.isdir(path) else addons
+
+    if method == 'SYNC':
+        changed = sync_project(table, files, folder)
+    else:
+        # Only the files that changed since the last install are reloaded
+        changed, state = install_changes(table, files, folder)
+        install_project(path, files, addons)
+        sync_states[(table.path, folder)] = state
+
+    if os.path.isdir(target):
+        write_fingerprint(target, fingerprint)
+
+    return fingerprint, changed, new, files
+
+
+def report_duplicates(operator, duplicates):
+    # Refuse a batch operation where several projects would write the same file or folder
+    # Returns True if there were any
+    for path, names in duplicates:
+        operator.report({'ERROR'}, "{0} would write the same file {1}, select only one of them".format(", ".join(names), path))
+    return len(duplicates) > 0
+
+
+def report_batch(operator, action, results, seconds):
+    # Print the per project report and give the operator a short summary
+    lines = batch_report(action, results, seconds)
+    print("\n".join(lines))
+
+    failed = [r.name for r in results if not r.ok]
+    if failed:
+        operator.report({'WARNING'}, "{0}, see the console (failed: {1})".format(lines[0], ", ".join(failed)))
+    else:
+        operator.report({'INFO'}, lines[0])
+
+
+def with_memory(message, memory):
+    # Add the peak memory of a MemoryPeak to a report, it is only measured while profiling
+    return "{0}, {1}".format(message, memory) if memory.enabled else message
+
+
+def is_project_valid(context):
+    # Returns a list of problems with the current project
+    status = get_status(context)
+
+    return status.messages if status else []
+
+
+#######################################################################################
+# UI
+#######################################################################################            
+
+# Most unopened files listed in the panel
+UNOPENED_SHOWN = 50
+
+# Most timings listed in the profile section of the panel
+PROFILE_SHOWN = 20
+
+# Compile errors listed in the info box
+ERRORS_SHOWN = 10
+
+
+class AddonDevelopmentProjectPanel(Panel):
+    """ Creates a panel in the text editor """
+    bl_label = "Addon Development Tool"
+    bl_idname = "TEXT_PT_addon_dev"
+    bl_space_type = 'TEXT_EDITOR'
+    bl_region_type = 'UI'
+
+    def draw(self, context):
+        project_list = context.scene.project_list
+        list_index = context.scene.project_list_index
+
+        layout = self.layout
+
+        row = layout.row()
+        row.template_list("AddonProjectUIList", "", context.scene, "project_list", context.scene, "project_list_index",
+                          rows=5)
+
+        row = layout.row(align=True)
+        row.operator('addon_dev_tool.new_addon')
+        #row.operator('addon_dev_tool.new_script')
+        row.operator('addon_dev_tool.delete_project')
+
+        # Batch operations on the checked projects
+        if any(p.selected for p in project_list):
+            row = layout.row(align=True)
+            row.operator('addon_dev_tool.batch_validate')
+            row.operator('addon_dev_tool.batch_install')
+            row.operator('addon_dev_tool.batch_export')
+
+        # Only if a valid project is selected
+        status = get_status(context)
+        if status:
+            item = project_list[list_index]
+            
+            if status.updated and not status.exists:
+                layout.prop(item, 'location', icon='ERROR')
+            else:
+                layout.prop(item, 'location')
+
+            if status.is_folder:
+                row = layout.row(align=True)
+                row.prop(item, 'ignore')
+                row.prop(item, 'use_gitignore', text="", icon='FILTER')
+
+            if not status.updated:
+                layout.label("Checking project...")
+
+            if status.exists:
+                layout.label("{0} files, {1} of {2} scripts open".format(
+                    status.file_count, status.opened, status.opened + len(status.unopened)))
+                layout.separator()
+
+                col = layout.column(align=True)
+                row = col.row(align=True)
+                row.operator('addon_dev_tool.open_files')
+                row.operator('addon_dev_tool.close_files')
+
+                row = col.row(align=True)
+                row.operator('addon_dev_tool.new_project_file')
+                row.operator('addon_dev_tool.close_all_files')
+
+                row = col.row(align=True)
+                row.operator('addon_dev_tool.refresh_files', icon='FILE_REFRESH')
+
+                # Unopened files, to open just the ones needed
+                unopened = status.unopened
+                if unopened:
+                    wm = context.window_manager
+                    box = layout.box()
+                    box.prop(wm, 'adt_show_unopened', text="Unopened Files ({0})".format(len(unopened)),
+                             icon='TRIA_DOWN' if wm.adt_show_unopened else 'TRIA_RIGHT', emboss=False)
+
+                    if wm.adt_show_unopened:
+                        root = bpy.path.abspath(item.location)
+                        col = box.column(align=True)
+                        for path in unopened[:UNOPENED_SHOWN]:
+                            col.operator('addon_dev_tool.open_file', text=os.path.relpath(path, root),
+                                         icon='FILE_SCRIPT').filepath = path
+
+                layout.separator()
+                col = layout.column(align=True)
+                if item.is_addon:
+                    col.operator('addon_dev_tool.install_addon')
+                    col.operator('addon_dev_tool.remove_addon')
+                else:
+                    row.operator('addon_dev_tool.run_script')
+                    
+                row = layout.row()
+                row.operator('addon_dev_tool.export')
+
+                # Info Box
+                info = status.messages + status.compile_errors[:ERRORS_SHOWN]
+                if len(info) > 0:
+                    box = layout.box()
+                    for i in info:
+                        box.label(text=i)
+                    if len(status.compile_errors) > ERRORS_SHOWN:
+                        box.label(text="... and {0} more".format(len(status.compile_errors) - ERRORS_SHOWN))
+
+        if profiler.enabled:
+            self.draw_profile(context)
+
+    def draw_profile(self, context):
+        # Collapsible table of the timings collected while profiling
+        wm = context.window_manager
+        layout = self.layout
+
+        box = layout.box()
+        box.prop(wm, 'adt_show_profile', text="Profile", icon='TRIA_DOWN' if wm.adt_show_profile else 'TRIA_RIGHT',
+                 emboss=False)
+
+        if wm.adt_show_profile:
+            col = box.column(align=True)
+            for name, count, p50, p95, longest in profiler.stats()[:PROFILE_SHOWN]:
+                row = col.row()
+                row.label(name)
+                row.label("{0}x  {1:.1f} / {2:.1f} / {3:.1f} ms".format(count, p50 * 1000, p95 * 1000, longest * 1000))
+
+            row = box.row(align=True)
+            row.operator('addon_dev_tool.profile_clear')
+            row.operator('addon_dev_tool.profile_dump')
+            row.operator('addon_dev_tool.profile_record',
+                         text="Stop cProfile" if profiler.profile else "Start cProfile")
+
+    def draw_header(self, context):
+        """ Just for fun """
+        layout = self.layout
+        # layout.label(icon='FILE_TEXT')
+
+
+class Project(PropertyGroup):
+    """ Holds location, name, etc of each project """
+
+    name = StringProperty(name="Name", description="The name of the current project", default="untitled",
+                          update=project_changed)
+
+    location = StringProperty(name="Location", description="The location of the project on the users machine",
+                              default="", subtype='FILE_PATH', update=project_changed)
+
+    is_addon = BoolProperty(name="Addon", description="Is the project a script or an addon?", default=True,
+                            update=project_changed)
+
+    ignore = StringProperty(name="Ignore",
+                            description="Comma separated gitignore style patterns of files to leave out of the project",
+                            default="", update=project_changed)
+
+    use_gitignore = BoolProperty(name="Use .gitignore", description="Also leave out files ignored by .gitignore",
+                                 default=True, update=project_changed)
+
+    uid = StringProperty(name="ID", description="Identifies the project in the saved project list", default="")
+
+    selected = BoolProperty(name="Selected", description="Include the project in batch operations", default=False)
+
+
+class AddonProjectUIList(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        addon_icon = 'FILE_TEXT'
+        script_icon = 'FILE_SCRIPT'
+
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+
+            layout.prop(item, 'selected', text="")
+            if item.is_addon:
+                layout.prop(item, 'name', emboss=False, icon=addon_icon)
+            else:
+                layout.prop(item, 'name', emboss=False, icon=script_icon)
+
+        elif self.layout_type in {'GRID'}:
+            layout.alignment = 'CENTER'
+            layout.label("", icon=addon_icon)
+
+
+class ADTPreferences(AddonPreferences):
+    bl_idname = __package__
+
+    save_delay = FloatProperty(name="Save Delay",
+                               description="Seconds to wait after the last change to the project list before saving it",
+                               default=1.0, min=0.0, max=60.0)
+
+    install_method = EnumProperty(name="Install Method", description="How Install Addon installs the project",
+                                  items=(('COPY', "Copy", "Copy the project to the addons folder, replacing the "
+                                                          "installed copy in one step"),
+                                         ('SYNC', "Sync", "Copy changed files to the addons folder and reload them")),
+                                  default='COPY')
+
+    compression = EnumProperty(name="Compression", description="Compression used when exporting",
+                               items=(('STORED', "None", "Store files without compression"),
+                                      ('DEFLATED', "Deflate", "Standard zip compression"),
+                                      ('LZMA', "LZMA", "Smaller archives, slower to create")),
+                               default='DEFLATED')
+
+    compression_level = IntProperty(name="Level", description="Compression level, higher is smaller but slower",
+                                    default=6, min=0, max=9)
+
+    open_limit = IntProperty(name="Open Limit",
+                             description="Most files Open Project Files loads at once, the rest can be opened from "
+                                         "the panel (0 opens all)",
+                             default=0, min=0)
+
+    watch_files = BoolProperty(name="Watch Files",
+                               description="Automatically load external changes to open project files",
+                               default=False)
+
+    watch_interval = FloatProperty(name="Watch Interval", description="Seconds between checks for changed files",
+                                   default=1.0, min=0.1, max=60.0)
+
+    skip_unchanged = BoolProperty(name="Skip Unchanged Installs",
+                                  description="Don't reinstall an enabled addon when none of its files changed",
+                                  default=True)
+
+    fingerprint_content = BoolProperty(name="Hash Contents",
+                                       description="Compare file contents instead of sizes and modification times",
+                                       default=False)
+
+    verify_installed = BoolProperty(name="Check Installed Copy",
+                                    description="Compare with the fingerprint saved in the installed addon folder "
+                                                "instead of the one saved with the project",
+                                    default=False)
+
+    skip_large_files = BoolProperty(name="Placeholders For Large Files",
+                                    description="Open a short placeholder text instead of loading large files "
+                                                "into the text editor",
+                                    default=True)
+
+    large_file_size = IntProperty(name="Large File Size", description="Size in KB above which a file counts as large",
+                                  default=1024, min=1)
+
+    check_syntax = BoolProperty(name="Check Syntax",
+                                description="Compile the project's scripts before installing or exporting it, and "
+                                            "stop if any of them has an error",
+                                default=True)
+
+    restore_session = BoolProperty(name="Restore Open Files",
+                                   description="Remember the open files of each project with their cursor and "
+                                               "scroll positions, and open them again when the project is next used",
+                                   default=True)
+
+    profile = BoolProperty(name="Profile",
+                           description="Time operators, panel drawing and handlers, and show the timings in the panel",
+                           default=False)
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row()
+        row.prop(self, 'install_method')
+        row.prop(self, 'check_syntax')
+
+        row = layout.row()
+        row.prop(self, 'skip_unchanged')
+        row.prop(self, 'fingerprint_content')
+        row.prop(self, 'verify_installed')
+        layout.prop(self, 'open_limit')
+
+        row = layout.row()
+        row.prop(self, 'skip_large_files')
+        row.prop(self, 'large_file_size')
+        layout.prop(self, 'restore_session')
+
+        row = layout.row()
+        row.prop(self, 'compression')
+        row.prop(self, 'compression_level')
+
+        row = layout.row()
+        row.prop(self, 'watch_files')
+        row.prop(self, 'watch_interval')
+
+        layout.prop(self, 'profile')
+
+        layout.prop(self, 'save_delay')
+        layout.label("Project list saves: {0} written, {1} skipped".format(project_store.writes,
+                                                                          project_store.skipped))
+            
+            
+#######################################################################################
+# OPERATORS
+#######################################################################################
+# Seconds between the steps of a modal task, and texts opened or closed in each step
+TASK_INTERVAL = 0.05
+TASK_BATCH = 20
+
+
+class ModalTask:
+    """ Runs an operator's task_steps from timer events so the interface keeps responding, Esc cancels it """
+
+    # Whether the task works on the active project's files, and keeps other tasks off them until it ends
+    project_task = True
+
+    def run_task(self, context):
+        # task_steps is a generator yielding the fraction done after each step
+        # Without a window there are no timer events, so it runs to the end right away
+        self.task = Task()
+        self.timer = None
+
+        # Only one task at a time works on a project, so two installs never share a staging folder
+        scene = context.scene
+        self.uid = None
+        if self.project_task and 0 <= scene.project_list_index < len(scene.project_list):
+            self.uid = scene.project_list[scene.project_list_index].uid
+            running_tasks[self.uid] = self.task
+
+        self.steps = self.task_steps(context)
+
+        if context.window is None:
+            try:
+                for fraction in self.steps:
+                    pass
+            finally:
+                self.end_task(context)
+            return {'FINISHED'}
+
+        wm = context.window_manager
+        self.timer = wm.event_timer_add(TASK_INTERVAL, context.window)
+        wm.progress_begin(0, 100)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            # Closing the steps runs their cleanup, waiting for the worker to stop
+            self.task.cancel()
+            self.steps.close()
+            self.end_task(context)
+            self.report({'WARNING'}, "{0} cancelled".format(self.bl_label))
+            return {'CANCELLED'}
+
+        if event.type == 'TIMER':
+            try:
+                fraction = next(self.steps)
+            except StopIteration:
+                self.end_task(context)
+                return {'FINISHED'}
+            except Exception as e:
+                self.end_task(context)
+                self.report({'ERROR'}, "{0} failed: {1}".format(self.bl_label, e))
+                return {'CANCELLED'}
+
+            context.window_manager.progress_update(fraction * 100)
+
+        return {'PASS_THROUGH'}
+
+    def end_task(self, context):
+        if running_tasks.get(self.uid) is self.task:
+            del running_tasks[self.uid]
+
+        if self.timer is not None:
+            wm = context.window_manager
+            wm.event_timer_remove(self.timer)
+            wm.progress_end()
+        invalidate_status(context)
+
+    def preflight(self, uid, table, files):
+        # Compile the project's scripts in the task pool, use with yield from in task_steps
+        # Returns True if the task can go on, otherwise the errors are shown in the panel
+        prefs = get_preferences()
+        if prefs and not prefs.check_syntax:
+            return True
+
+        errors = yield from self.wait(get_task_pool().submit(check_syntax, table, files))
+        preflight_errors[uid] = errors
+
+        if errors:
+            self.report({'ERROR'}, "{0} scripts don't compile, see the panel: {1}".format(len(errors), errors[0]))
+        return not errors
+
+    def wait(self, future):
+        # Wait for work submitted to the task pool, use with yield from in task_steps
+        if self.timer is None:
+            return future.result()
+
+        try:
+            while not future.done():
+                yield self.task.fraction()
+        except GeneratorExit:
+            # Cancelled, let the worker stop and clean up after itself
+            try:
+                future.result()
+            except Exception:
+                pass
+            raise
+
+        return future.result()
+
+
+class ADTNewAddon(Operator):
+    bl_label = "New Addon"
+    bl_idname = "addon_dev_tool.new_addon"
+    bl_description = "Create a new addon"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        project = add_project(context.scene.project_list)
+        project.is_addon = True
+        context.scene.project_list_index = len(context.scene.project_list) - 1
+
+        return {'FINISHED'}
+
+
+class ADTNewScript(Operator):
+    bl_label = "New Script"
+    bl_idname = "addon_dev_tool.new_script"
+    bl_description = "Create a new script"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        project = add_project(context.scene.project_list)
+        project.is_addon = False
+        context.scene.project_list_index = len(context.scene.project_list) - 1
+
+        return {'FINISHED'}
+
+
+class ADTDeleteProject(Operator):
+    bl_label = "Delete Project"
+    bl_idname = "addon_dev_tool.delete_project"
+    bl_description = "Remove project from list (Will not delete files)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        """ You can only delete if there is something in the list!"""
+        return len(context.scene.project_list) > 0
+
+    def execute(self, context):
+        list = context.scene.project_list
+        index = context.scene.project_list_index
+
+        list.remove(index)
+        project_store.mark_changed()
+
+        if index > 0:
+            context.scene.project_list_index = index - 1
+
+        return {'FINISHED'}
+
+
+class ADTOpenFiles(ModalTask, Operator):
+    bl_label = "Open Project Files"
+    bl_idname = 'addon_dev_tool.open_files'
+    bl_description = "Open files from current project in the text editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        status = get_status(context)
+        return status is not None and len(status.unopened) > 0 and not is_task_running(context)
+
+    def execute(self, context):
+        return self.run_task(context)
+
+    def task_steps(self, context):
+        # Open files in the text editor from the current project, a batch at a time
+        prefs = get_preferences()
+        limit = prefs.open_limit if prefs else 0
+
+        project = context.scene.project_list[context.scene.project_list_index]
+        unopened = get_unopened(project)
+
+        # The files open when the project was last left, the next click opens the rest
+        session = get_saved_session(project) if prefs and prefs.restore_session else None
+        files = session_files(project, session) if session else {}
+        unopened = tuple(p for p in unopened if p in files) or unopened
+        paths = unopened[:limit] if limit else unopened
+
+        # Texts opened before a cancel stay open
+        loaded = []
+        missing = []
+        with MemoryPeak(profiler.enabled) as memory:
+            try:
+                for i in range(0, len(paths), TASK_BATCH):
+                    loaded.extend(open_texts(paths[i:i + TASK_BATCH], missing))
+                    yield len(loaded) / len(paths)
+            finally:
+                if loaded:
+                    show_text(bpy.context, loaded[0])
+                if files:
+                    apply_session(bpy.context, project, session, files)
+
+        if missing:
+            # Deleted since the project was last scanned
+            get_project_index(project).invalidate()
+            self.report({'WARNING'}, with_memory("Opened {0} files, {1} no longer exist".format(
+                len(loaded), len(missing)), memory))
+        elif len(unopened) > len(paths):
+            self.report({'INFO'}, with_memory("Opened {0} files, open the other {1} from the panel".format(
+                len(loaded), len(unopened) - len(paths)), memory))
+        else:
+            self.report({'INFO'}, with_memory("Opened {0} files".format(len(loaded)), memory))
+
+
+class ADTOpenFile(Operator):
+    bl_label = "Open File"
+    bl_idname = 'addon_dev_tool.open_file'
+    bl_description = "Open this project file in the text editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath = StringProperty(name="File Path", subtype='FILE_PATH')
+
+    def execute(self, context):
+        missing = []
+        loaded = open_texts([self.filepath], missing)
+        if loaded:
+            show_text(context, loaded[0])
+        invalidate_status(context)
+
+        # The panel's list of unopened files can be older than the file
+        if missing:
+            for index in file_indexes.values():
+                index.invalidate()
+            self.report({'WARNING'}, "{0} no longer exists".format(self.filepath))
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+
+class ADTNewProjectFile(Operator, ExportHelper):
+    bl_label = "New Project File"
+    bl_idname = 'addon_dev_tool.new_project_file'
+    bl_description = "Create a new file for the project and open it in the editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = ".py"
+    
+#    @classmethod
+#    def poll(self, context):
+#        # Make sure it is a multi file addon
+#        location = context.scene.project_list[context.scene.project_list_index].location
+#        
+#        if os.path.isdir(location):
+#            return True
+
+    # Set the filepath to the project location
+    def invoke(self, context, event):
+        location = context.scene.project_list[context.scene.project_list_index].location
+
+        if self.filepath == "":
+            self.filepath = location
+
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        # Create the file, an existing file is opened as it is
+        if not os.path.exists(self.filepath):
+            print("Creating", self.filepath)
+            f = open(self.filepath, 'w', encoding='utf-8')
+            f.close()
+
+        for index in file_indexes.values():
+            index.invalidate()
+        invalidate_status(context)
+
+        # Open the file in the text editor, or a placeholder for a large file
+        path = os.path.normpath(bpy.path.abspath(self.filepath))
+        with MemoryPeak(profiler.enabled) as memory:
+            open_texts([path])
+
+        text = text_index.get(path)
+        if text:
+            show_text(context, text)
+
+        self.report({'INFO'}, with_memory("Opened {0}".format(os.path.basename(path)), memory))
+        return {'FINISHED'}
+
+
+class ADTCloseFiles(Operator):
+    bl_label = "Close Project Files"
+    bl_idname = 'addon_dev_tool.close_files'
+    bl_description = "Close files from current project in the text editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        status = get_status(context)
+        return status is not None and status.opened > 0
+
+    def execute(self, context):
+        save_session(context, context.scene.project_list[context.scene.project_list_index])
+        count, seconds = close_files(context, False)
+        invalidate_status(context)
+
+        self.report({'INFO'}, "Closed {0} files in {1:.0f} ms".format(count, seconds * 1000))
+        return {'FINISHED'}
+
+
+class ADTCloseAllFiles(ModalTask, Operator):
+    bl_label = "Close All Files"
+    bl_idname = 'addon_dev_tool.close_all_files'
+    bl_description = "Closes all files in the text editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    project_task = False
+
+    @classmethod
+    def poll(self, context):
+        return len(bpy.data.texts) > 0
+
+    def execute(self, context):
+        return self.run_task(context)
+
+    def task_steps(self, context):
+        # Close every text, a batch at a time
+        start = time.time()
+        scene = context.scene
+        if 0 <= scene.project_list_index < len(scene.project_list):
+            save_session(context, scene.project_list[scene.project_list_index])
+
+        names = [text.name for text in bpy.data.texts]
+        hide_texts(context, set(names))
+
+        closed = 0
+        try:
+            for i in range(0, len(names), TASK_BATCH):
+                for name in names[i:i + TASK_BATCH]:
+                    text = bpy.data.texts.get(name)
+                    if text:
+                        bpy.data.texts.remove(text)
+                        closed += 1
+                yield closed / len(names)
+        finally:
+            text_index.rebuild()
+
+        self.report({'INFO'}, "Closed {0} files in {1:.0f} ms".format(closed, (time.time() - start) * 1000))
+
+
+class ADTRefreshFiles(Operator):
+    bl_label = "Refresh Files"
+    bl_idname = 'addon_dev_tool.refresh_files'
+    bl_description = "Refresh all open project files in the text editor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        # Find all modified files from the project and update them
+        # Files that grew too large are left alone rather than loaded whole
+        # Blender also counts a text as modified when its file was deleted, those are left as they are
+        limit = get_large_file_size()
+        reloaded = skipped = 0
+        missing = []
+
+        with MemoryPeak(profiler.enabled) as memory:
+            for text in get_project_texts(context):
+                if text.filepath and text.is_modified:
+                    try:
+                        size = os.path.getsize(text_path(text))
+                    except OSError:
+                        missing.append(text.name)
+                        continue
+
+                    if limit and size > limit:
+                        skipped += 1
+                    elif reload_text(text):
+                        reloaded += 1
+
+        message = "Loaded external changes to {0} files".format(reloaded)
+        if skipped:
+            message += ", skipped {0} large files".format(skipped)
+        if missing:
+            message += ", {0} no longer exist: {1}".format(len(missing), ", ".join(missing))
+
+        self.report({'WARNING'} if skipped or missing else {'INFO'}, with_memory(message, memory))
+
+        return {'FINISHED'}
+
+
+class ADTInstallAddon(ModalTask, Operator):
+    bl_label = "Install Addon"
+    bl_idname = 'addon_dev_tool.install_addon'
+    bl_description = "Install and enable the addon"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(self, context):
+        status = get_status(context)
+        return status is not None and status.exists and len(status.messages) == 0 and not is_task_running(context)
+
+    def execute(self, context):
+        return self.run_task(context)
+
+    def task_steps(self, context):
+        # Files are hashed and copied in the thread pool, enabling and reloading happen on the main thread
+        prefs = get_preferences()
+        project = context.scene.project_list[context.scene.project_list_index]
+        uid, name = project.uid, project.name
+        path = bpy.path.abspath(project.location)
+        addon_name = get_addon_name(path)
+        install_path = os.path.join(bpy.utils.user_resource('SCRIPTS', "addons"), addon_name)
+        project_files = get_files(context)
+        table = get_project_table(project)
+
+        # Skip installs that wouldn't change anything
+        fingerprint = yield from self.wait(get_task_pool().submit(
+            project_fingerprint, table, project_files, prefs.fingerprint_content if prefs else False))
+
+        if (prefs is None or prefs.skip_unchanged) and addon_name in bpy.context.user_preferences.addons:
+            if prefs and prefs.verify_installed and os.path.isdir(path):
+                installed = read_fingerprint(install_path)
+            else:
+                installed = project_store.get_meta(uid, 'install_fingerprint')
+
+            if installed == fingerprint:
+                self.report({'INFO'}, "Addon {0} is already up to date".format(name))
+                return
+
+        if not (yield from self.preflight(uid, table, project_files)):
+            return
+
+        if prefs and prefs.install_method == 'SYNC':
+            yield from self.sync_install(table, project_files, name)
+        else:
+            yield from self.copy_install(table, project_files, name)
+
+        project_store.set_meta(uid, 'install_fingerprint', fingerprint)
+        if os.path.isdir(install_path):
+            write_fingerprint(install_path, fingerprint)
+
+    def copy_install(self, table, project_files, name):
+        # Copy the project straight into the addons folder, swapping out the installed copy
+        path = table.path
+        addon_name = get_addon_name(path)
+        addons = bpy.utils.user_resource('SCRIPTS', "addons", create=True)
+        target = os.path.join(addons, addon_name) if os.path.isdir(path) else addons
+
+        if not os.path.exists(path):
+            raise OSError("Project location does not exist")
+
+        # Only the files that changed since the last install are reloaded
+        changed, state = yield from self.wait(get_task_pool().submit(install_changes, table, project_files, target))
+        new = yield from self.wait(get_task_pool().submit(install_project, path, project_files, addons, self.task))
+        sync_states[(path, target)] = state
+
+        if addon_name in bpy.context.user_preferences.addons and addon_name in sys.modules:
+            if changed:
+                self.reload(addon_name, changed, path, project_files)
+        else:
+            if new:
+                bpy.ops.wm.addon_refresh()
+            bpy.ops.wm.addon_enable(module=addon_name)
+
+        self.report({'INFO'}, "Installed addon {0}".format(name))
+
+    def reload(self, addon_name, changed, path, files):
+        # Reload the modules affected by the changed files and print how long each took
+        timings = reload_addon(addon_name, changed, path, files)
+
+        for name, seconds in timings:
+            print("Reloaded {0} in {1:.1f} ms".format(name, seconds * 1000))
+            if profiler.enabled:
+                profiler.add("reload: " + name, seconds)
+
+        total = sum(seconds for name, seconds in timings)
+        self.report({'INFO'}, "Reloaded {0} modules in {1:.0f} ms".format(len(timings), total * 1000))
+
+    def sync_install(self, table, project_files, name):
+        # Copy only the changed files into the addons folder and reload their modules
+        path = table.path
+        addon_name = get_addon_name(path)
+        addons = bpy.utils.user_resource('SCRIPTS', "addons", create=True)
+
+        if os.path.isdir(path):
+            target = os.path.join(addons, addon_name)
+        else:
+            target = addons
+
+        changed = yield from self.wait(get_task_pool().submit(sync_project, table, project_files, target, self.task))
+
+        if addon_name in bpy.context.user_preferences.addons and addon_name in sys.modules:
+            if changed:
+                self.reload(addon_name, changed, path, project_files)
+        else:
+            bpy.ops.wm.addon_enable(module=addon_name)
+
+        self.report({'INFO'}, "Installed addon {0}, {1} files changed".format(name, len(changed)))
+
+
+class ADTRemoveAddon(Operator):
+    bl_label = "Uninstall Addon"
+    bl_idname = 'addon_dev_tool.remove_addon'
+    bl_description = "Remove the addon"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        status = get_status(context)
+        return status is not None and status.installed
+
+    def execute(self, context):
+        project = context.scene.project_list[context.scene.project_list_index]
+        addon_name = get_addon_name(project.location)
+
+        bpy.ops.wm.addon_remove(module=addon_name)
+        sync_states.clear()
+        invalidate_status(context)
+        print(addon_name)
+        
+        self.report({'INFO'}, "Uninstalled addon {0}".format(addon_name))
+
+        return {'FINISHED'}
+    
+
+class ADTExport(ModalTask, Operator, ExportHelper):
+    bl_label = "Export For Distribution"
+    bl_idname = 'addon_dev_tool.export'
+    bl_description = "Export the file"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filename_ext = ".zip"
+
+    @classmethod
+    def poll(self, context):
+        status = get_status(context)
+        return status is not None and status.exists and not is_task_running(context)
+
+    def execute(self, context):
+        return self.run_task(context)
+
+    def task_steps(self, context):
+        project = context.scene.project_list[context.scene.project_list_index]
+        uid, name = project.uid, project.name
+        path = bpy.path.abspath(project.location)
+        project_files = get_files(context)
+
+        prefs = get_preferences()
+        method = prefs.compression if prefs else 'DEFLATED'
+        level = prefs.compression_level if prefs else 6
+
+        if not os.path.exists(path):
+            self.report({'ERROR'}, "Project location does not exist")
+            return
+
+        table = get_project_table(project)
+        if not (yield from self.preflight(uid, table, project_files)):
+            return
+
+        # The archive is written next to its final name and only moved there when it is complete
+        with MemoryPeak(profiler.enabled) as memory:
+            stats = yield from self.wait(get_task_pool().submit(export_project, path, project_files, self.filepath,
+                                                                method, level, self.task, table))
+
+        self.report({'INFO'}, with_memory("Exported addon {0}: {1}".format(name, stats), memory))  
+
+
+class ADTBatchValidate(Operator):
+    bl_label = "Validate"
+    bl_idname = 'addon_dev_tool.batch_validate'
+    bl_description = "Check every selected project for problems"
+
+    @classmethod
+    def poll(self, context):
+        return len(get_selected_projects(context)) > 0
+
+    def execute(self, context):
+        start = time.perf_counter()
+        version = tuple(bpy.app.version)
+
+        projects = get_selected_projects(context)
+        with batch_pool() as pool:
+            jobs = []
+            for project in projects:
+                path = bpy.path.abspath(project.location)
+                jobs.append((project.name, validate_job,
+                             (get_project_index(project), get_project_table(project), path, version,
+                              project.is_addon, pool)))
+
+            results = run_batch(jobs)
+        for project, result in zip(projects, results):
+            if result.ok:
+                messages, errors = result.value
+                preflight_errors[project.uid] = errors
+                if messages or errors:
+                    result.ok = False
+                    result.message = "; ".join(messages + errors)
+
+        invalidate_status(context, projects)
+        report_batch(self, "Validated", results, time.perf_counter() - start)
+        return {'FINISHED'}
+
+
+class ADTBatchInstall(Operator):
+    bl_label = "Install"
+    bl_idname = 'addon_dev_tool.batch_install'
+    bl_description = "Install and enable every selected addon"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        projects = get_selected_projects(context)
+        return any(p.is_addon for p in projects) and not any(p.uid in running_tasks for p in projects)
+
+    def execute(self, context):
+        start = time.perf_counter()
+        prefs = get_preferences()
+        addons = bpy.utils.user_resource('SCRIPTS', "addons", create=True)
+        enabled = context.user_preferences.addons
+
+        method = prefs.install_method if prefs else 'COPY'
+        content = prefs.fingerprint_content if prefs else False
+        skip = prefs.skip_unchanged if prefs else True
+        verify = prefs.verify_installed if prefs else False
+        check = prefs.check_syntax if prefs else True
+
+        # The copying happens in the workers, enabling and reloading here
+        projects = [p for p in get_selected_projects(context) if p.is_addon]
+        if report_duplicates(self, duplicate_outputs(
+                (p.name, os.path.join(addons, get_addon_name(bpy.path.abspath(p.location)))) for p in projects)):
+            return {'CANCELLED'}
+
+        with batch_pool() as pool:
+            jobs = []
+            for project in projects:
+                path = bpy.path.abspath(project.location)
+                installed = None
+
+                if skip and get_addon_name(path) in enabled:
+                    if verify and os.path.isdir(path):
+                        installed = read_fingerprint(os.path.join(addons, get_addon_name(path)))
+                    else:
+                        installed = project_store.get_meta(project.uid, 'install_fingerprint')
+
+                jobs.append((project.name, install_job,
+                             (get_project_index(project), get_project_table(project), path, addons, method,
+                              content, installed, check, pool)))
+
+            results = run_batch(jobs)
+
+        if any(r.ok and r.value and r.value[2] for r in results):
+            bpy.ops.wm.addon_refresh()
+
+        for project, result in zip(projects, results):
+            if not result.ok:
+                continue
+            if result.value is None:
+                result.message = "up to date"
+                continue
+
+            fingerprint, changed, new, files = result.value
+            path = bpy.path.abspath(project.location)
+            addon_name = get_addon_name(path)
+
+            main_start = time.perf_counter()
+            try:
+                if addon_name in enabled and addon_name in sys.modules:
+                    if changed:
+                        reload_addon(addon_name, changed, path, files)
+                else:
+                    bpy.ops.wm.addon_enable(module=addon_name)
+            except Exception as e:
+                result.ok = False
+                result.message = "{0}: {1}".format(type(e).__name__, e)
+            else:
+                project_store.set_meta(project.uid, 'install_fingerprint', fingerprint)
+                result.message = "{0} files changed".format(len(changed))
+            result.seconds += time.perf_counter() - main_start
+
+        invalidate_status(context, projects)
+        report_batch(self, "Installed", results, time.perf_counter() - start)
+        return {'FINISHED'}
+
+
+class ADTBatchExport(Operator):
+    bl_label = "Export"
+    bl_idname = 'addon_dev_tool.batch_export'
+    bl_description = "Zip every selected project into a folder"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory = StringProperty(name="Folder", description="Folder the zip files are written to", subtype='DIR_PATH')
+
+    @classmethod
+    def poll(self, context):
+        projects = get_selected_projects(context)
+        return len(projects) > 0 and not any(p.uid in running_tasks for p in projects)
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        start = time.perf_counter()
+        prefs = get_preferences()
+        method = prefs.compression if prefs else 'DEFLATED'
+        level = prefs.compression_level if prefs else 6
+        check = prefs.check_syntax if prefs else True
+
+        # Projects with the same folder name would write the same zip file at the same time
+        projects = get_selected_projects(context)
+        filepaths = [os.path.join(bpy.path.abspath(self.directory), get_addon_name(bpy.path.abspath(p.location)) +
+                                  ".zip") for p in projects]
+        if report_duplicates(self, duplicate_outputs((p.name, f) for p, f in zip(projects, filepaths))):
+            return {'CANCELLED'}
+
+        with batch_pool() as pool:
+            jobs = []
+            for project, filepath in zip(projects, filepaths):
+                path = bpy.path.abspath(project.location)
+                jobs.append((project.name, export_job, (get_project_index(project), get_project_table(project),
+                                                        path, filepath, method, level, check, pool)))
+
+            results = run_batch(jobs)
+        for result in results:
+            if result.ok:
+                result.message = str(result.value)
+
+        report_batch(self, "Exported", results, time.perf_counter() - start)
+        return {'FINISHED'}
+
+
+class ADTProfileClear(Operator):
+    bl_label = "Clear"
+    bl_idname = 'addon_dev_tool.profile_clear'
+    bl_description = "Forget the collected timings"
+
+    def execute(self, context):
+        profiler.clear()
+
+        return {'FINISHED'}
+
+
+class ADTProfileDump(Operator, ExportHelper):
+    bl_label = "Save"
+    bl_idname = 'addon_dev_tool.profile_dump'
+    bl_description = "Save the collected timings to a JSON file"
+
+    filename_ext = ".json"
+
+    def execute(self, context):
+        profiler.dump(self.filepath)
+
+        self.report({'INFO'}, "Saved timings to {0}".format(self.filepath))
+        return {'FINISHED'}
+
+
+class ADTProfileRecord(Operator, ExportHelper):
+    bl_label = "cProfile"
+    bl_idname = 'addon_dev_tool.profile_record'
+    bl_description = "Start recording with cProfile, or stop and save the recording"
+
+    filename_ext = ".prof"
+
+    def invoke(self, context, event):
+        if profiler.profile is None:
+            profiler.start_recording()
+            return {'FINISHED'}
+
+        return ExportHelper.invoke(self, context, event)
+
+    def execute(self, context):
+        if profiler.profile is None:
+            profiler.start_recording()
+        else:
+            profiler.stop_recording(self.filepath)
+            self.report({'INFO'}, "Saved cProfile recording to {0}".format(self.filepath))
+
+        return {'FINISHED'}
+
+
+def profile_classes(classes):
+    # Wrap the functions Blender calls on operators and panels with timers,
+    # including the ones they get from mixins like ModalTask, which do the work of modal operators
+    for cls in classes:
+        for attr in ('poll', 'invoke', 'execute', 'modal', 'draw'):
+            owner = next((c for c in cls.__mro__ if attr in c.__dict__), None)
+            if owner is None or (owner is not cls and owner.__module__ != __name__):
+                continue
+
+            func = owner.__dict__[attr]
+            name = "{0}.{1}".format(cls.__name__, attr)
+
+            if isinstance(func, classmethod):
+                setattr(cls, attr, classmethod(profiler.wrap(name, func.__func__)))
+            elif func is not None:
+                setattr(cls, attr, profiler.wrap(name, func))
+
+
+# Timings are always wired in, but only cost an attribute check while profiling is disabled
+profile_classes([c for c in list(globals().values()) if isinstance(c, type) and issubclass(c, (Operator, Panel))
+                 and c.__module__ == __name__])
+
+get_projects = profiler.wrap("load_post: get_projects", get_projects)
+reset_text_index = profiler.wrap("load_post: reset_text_index", reset_text_index)
+flush_projects = profiler.wrap("load_pre/save_pre: flush_projects", flush_projects)
+cancel_tasks = profiler.wrap("load_pre: cancel_tasks", cancel_tasks)
+save_projects = profiler.wrap("scene_update_pre: save_projects", save_projects)
+apply_file_changes = profiler.wrap("scene_update_post: apply_file_changes", apply_file_changes)
+update_statuses = profiler.wrap("scene_update_post: update_statuses", update_statuses)
+track_session = profiler.wrap("scene_update_post: track_session", track_session)
+load_shown_texts = profiler.wrap("scene_update_post: load_shown_texts", load_shown_texts)
+reset_sessions = profiler.wrap("load_post: reset_sessions", reset_sessions)
+
+
+def register():
+    bpy.utils.register_module(__name__)
+
+    bpy.types.Scene.project_list = CollectionProperty(type=Project)
+    bpy.types.Scene.project_list_index = IntProperty(name="Index for project_list", default=0)
+    bpy.types.WindowManager.adt_show_unopened = BoolProperty(name="Show Unopened Files", default=False)
+    bpy.types.WindowManager.adt_show_profile = BoolProperty(name="Show Profile", default=True)
+
+    bpy.app.handlers.load_pre.append(flush_projects)
+    bpy.app.handlers.save_pre.append(flush_projects)
+    bpy.app.handlers.load_pre.append(cancel_tasks)
+    bpy.app.handlers.load_post.append(get_projects)
+    bpy.app.handlers.load_post.append(reset_text_index)
+    bpy.app.handlers.load_post.append(reset_sessions)
+    bpy.app.handlers.scene_update_pre.append(save_projects)
+    bpy.app.handlers.scene_update_post.append(apply_file_changes)
+    bpy.app.handlers.scene_update_post.append(update_statuses)
+    bpy.app.handlers.scene_update_post.append(track_session)
+    bpy.app.handlers.scene_update_post.append(load_shown_texts)
+    atexit.register(write_projects)
+
+
+def unregister():
+    atexit.unregister(write_projects)
+    flush_projects(None)
+    file_watcher.stop()
+    cancel_tasks(None)
+    stop_task_pool()
+
+    bpy.utils.unregister_module(__name__)
+
+    del bpy.types.Scene.project_list
+    del bpy.types.Scene.project_list_index
+    del bpy.types.WindowManager.adt_show_unopened
+    del bpy.types.WindowManager.adt_show_profile
+
+    bpy.app.handlers.load_pre.remove(flush_projects)
+    bpy.app.handlers.save_pre.remove(flush_projects)
+    bpy.app.handlers.load_pre.remove(cancel_tasks)
+    bpy.app.handlers.load_post.remove(get_projects)
+    bpy.app.handlers.load_post.remove(reset_text_index)
+    bpy.app.handlers.load_post.remove(reset_sessions)
+    bpy.app.handlers.scene_update_pre.remove(save_projects)
+    bpy.app.handlers.scene_update_post.remove(apply_file_changes)
+    bpy.app.handlers.scene_update_post.remove(update_statuses)
+    bpy.app.handlers.scene_update_post.remove(track_session)
+    bpy.app.handlers.scene_update_post.remove(load_shown_texts)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The addon package, and the bpy stand-in in place of Blender's
+TESTS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS))
+sys.path.insert(0, os.path.join(TESTS, "stubs"))
@@ -0,0 +1,18 @@
+# A small stand-in for Blender's bpy module, just enough to import the ui module
+# and call its handlers and operators from tests. Nothing is drawn and operators
+# called through bpy.ops are only recorded.
+
+from . import types, props, app, path, utils, ops
+
+context = types.Context()
+data = types.BlendData()
+
+
+def reset():
+    # Start over with an empty blend file
+    global context, data
+    context = types.Context()
+    data = types.BlendData()
+    ops.calls.clear()
+    for handlers in app.handlers.all_handlers():
+        del handlers[:]
@@ -0,0 +1,3 @@
+from . import handlers
+
+version = (2, 79, 0)
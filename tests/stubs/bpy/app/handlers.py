@@ -0,0 +1,13 @@
+load_pre = []
+load_post = []
+save_pre = []
+scene_update_pre = []
+scene_update_post = []
+
+
+def persistent(func):
+    return func
+
+
+def all_handlers():
+    return load_pre, load_post, save_pre, scene_update_pre, scene_update_post
@@ -0,0 +1,17 @@
+# Operators called through bpy.ops, as ("text.reload", context override or None, kwargs), nothing runs
+calls = []
+
+
+class Category:
+    def __init__(self, name):
+        self.name = name
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            calls.append(("{0}.{1}".format(self.name, name), args[0] if args else None, kwargs))
+            return {'FINISHED'}
+        return call
+
+
+wm = Category("wm")
+text = Category("text")
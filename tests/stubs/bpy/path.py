@@ -0,0 +1,10 @@
+import os
+
+# Folder of the open blend file, paths starting with // are relative to it
+blend_folder = os.getcwd()
+
+
+def abspath(path):
+    if path.startswith("//"):
+        return os.path.join(blend_folder, path[2:])
+    return path
@@ -0,0 +1,53 @@
+# Properties are plain class attributes holding their default, so instances read the default
+# until something is assigned. Update callbacks and limits are ignored.
+
+
+def StringProperty(default="", **options):
+    return default
+
+
+def BoolProperty(default=False, **options):
+    return default
+
+
+def IntProperty(default=0, **options):
+    return default
+
+
+def FloatProperty(default=0.0, **options):
+    return default
+
+
+def EnumProperty(items=(), default=None, **options):
+    return default if default is not None else items[0][0]
+
+
+class Collection(list):
+    """ Value of a CollectionProperty """
+
+    def __init__(self, type):
+        list.__init__(self)
+        self.type = type
+
+    def add(self):
+        item = self.type()
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+
+class CollectionProperty:
+    """ Gives every instance of the class it is set on a collection of its own """
+
+    def __init__(self, type, **options):
+        self.type = type
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        key = '_collection_{0}'.format(id(self))
+        if key not in instance.__dict__:
+            instance.__dict__[key] = Collection(self.type)
+        return instance.__dict__[key]
@@ -0,0 +1,184 @@
+import os
+
+
+class bpy_struct:
+    """ Base of the stand-in types, with the custom properties texts use """
+
+    def __getitem__(self, key):
+        return self.__dict__.setdefault('_custom', {})[key]
+
+    def __setitem__(self, key, value):
+        self.__dict__.setdefault('_custom', {})[key] = value
+
+    def get(self, key, default=None):
+        return self.__dict__.get('_custom', {}).get(key, default)
+
+
+class Operator(bpy_struct):
+    """ Operators keep what they report so tests can check it """
+
+    def __init__(self):
+        self.reports = []
+
+    def report(self, kind, message):
+        self.reports.append((set(kind), message))
+
+
+class Panel(bpy_struct):
+    pass
+
+
+class UIList(bpy_struct):
+    pass
+
+
+class PropertyGroup(bpy_struct):
+    pass
+
+
+class AddonPreferences(bpy_struct):
+    pass
+
+
+class Scene(bpy_struct):
+    pass
+
+
+class WindowManager(bpy_struct):
+    def __init__(self):
+        self.windows = []
+
+    def progress_begin(self, low, high):
+        pass
+
+    def progress_update(self, value):
+        pass
+
+    def progress_end(self):
+        pass
+
+
+class SpaceTextEditor(bpy_struct):
+    def __init__(self):
+        self.text = None
+        self.top = 0
+
+
+class Spaces(list):
+    @property
+    def active(self):
+        return self[0]
+
+
+class Region(bpy_struct):
+    def __init__(self, type):
+        self.type = type
+
+
+class Area(bpy_struct):
+    def __init__(self, type):
+        self.type = type
+        self.spaces = Spaces([SpaceTextEditor()])
+        self.regions = [Region('HEADER'), Region('WINDOW'), Region('UI')]
+        self.redraws = 0
+
+    def tag_redraw(self):
+        self.redraws += 1
+
+
+class Screen(bpy_struct):
+    def __init__(self, areas=()):
+        self.areas = list(areas)
+
+
+class Window(bpy_struct):
+    def __init__(self, screen):
+        self.screen = screen
+
+
+class Addon(bpy_struct):
+    def __init__(self, module, preferences=None):
+        self.module = module
+        self.preferences = preferences
+
+
+class Addons(dict):
+    """ Enabled addons by module name """
+
+
+class UserPreferences(bpy_struct):
+    def __init__(self):
+        self.addons = Addons()
+
+
+class Context(bpy_struct):
+    """ A blend file with one scene and no window, like Blender in background mode """
+
+    def __init__(self):
+        self.scene = Scene()
+        self.user_preferences = UserPreferences()
+        self.window_manager = WindowManager()
+        self.window = None
+        self.screen = None
+
+    def copy(self):
+        return dict(self.__dict__)
+
+
+class Line:
+    def __init__(self, body):
+        self.body = body
+
+
+class Text(bpy_struct):
+    def __init__(self, name, filepath="", body=""):
+        self.name = name
+        self.filepath = filepath
+        self.is_dirty = False
+        self.is_modified = False
+        self.current_line_index = 0
+        self.current_character = 0
+        self.from_string(body)
+
+    def from_string(self, body):
+        self.lines = [Line(line) for line in body.split('\n')]
+
+    def write(self, text):
+        self.from_string(self.as_string() + text)
+
+    def as_string(self):
+        return '\n'.join(line.body for line in self.lines)
+
+    @property
+    def current_line(self):
+        return self.lines[self.current_line_index]
+
+
+class Texts(list):
+    """ bpy.data.texts, texts are looked up by name """
+
+    def get(self, name, default=None):
+        return next((text for text in self if text.name == name), default)
+
+    def unique_name(self, name):
+        unique, number = name, 0
+        while self.get(unique):
+            number += 1
+            unique = "{0}.{1:03}".format(name, number)
+        return unique
+
+    def new(self, name):
+        text = Text(self.unique_name(name))
+        self.append(text)
+        return text
+
+    def load(self, filepath):
+        with open(filepath, encoding='utf-8', errors='replace') as f:
+            text = Text(self.unique_name(os.path.basename(filepath)), filepath, f.read())
+        self.append(text)
+        return text
+
+
+class BlendData:
+    def __init__(self):
+        self.texts = Texts()
@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# The user scripts folder, tests point it at a temporary folder of their own
+scripts_folder = os.path.join(tempfile.gettempdir(), "bpy-stub-scripts")
+
+
+def script_path_user():
+    return scripts_folder
+
+
+def user_resource(resource_type, path="", create=False):
+    folder = os.path.join(scripts_folder, path)
+    if create:
+        os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def register_module(module):
+    pass
+
+
+def unregister_module(module):
+    pass
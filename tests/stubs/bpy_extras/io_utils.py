@@ -0,0 +1,6 @@
+class ImportHelper:
+    filepath = ""
+
+
+class ExportHelper:
+    filepath = ""
@@ -0,0 +1,150 @@
+import os
+import zipfile
+
+import pytest
+
+from AddonDevTool import core
+from AddonDevTool.core import (build_archive, export_project, get_file_index, get_file_table, read_manifest,
+                               verify_manifest, CompressedCache, Task, Cancelled, MANIFEST_SUFFIX)
+
+
+FILES = {
+    "__init__.py": b'bl_info = {"name": "Test", "blender": (2, 79, 0), "category": "Development"}\n',
+    "ops.py": b"import bpy\n" * 200,
+    "data/names.txt": "café\n".encode('utf-8') * 50,
+    "data/empty.txt": b"",
+    "über.py": b"x = 1\n",
+}
+
+
+@pytest.fixture
+def addon(tmp_path):
+    # An addon package with a few files, one of them executable
+    root = tmp_path / "test_addon"
+    for name, data in FILES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    os.chmod(str(root / "ops.py"), 0o755)
+    return root
+
+
+def export(addon, filepath, method='DEFLATED', use_table=False):
+    # Export the addon like the panel does, with or without its file table
+    index = get_file_index(str(addon), (), False)
+    index.invalidate()
+    index.refresh()
+    table = get_file_table(str(addon), index) if use_table else None
+    return export_project(str(addon), index.files(), str(filepath), method, table=table)
+
+
+def read_members(filepath):
+    with zipfile.ZipFile(str(filepath)) as archive:
+        assert archive.testzip() is None
+        return {info.filename: (archive.read(info), info.external_attr >> 16) for info in archive.infolist()}
+
+
+@pytest.mark.parametrize('method', ['STORED', 'DEFLATED', 'LZMA'])
+@pytest.mark.parametrize('use_table', [False, True])
+def test_round_trip(addon, tmp_path, method, use_table):
+    filepath = tmp_path / "out.zip"
+    stats = export(addon, filepath, method, use_table)
+
+    members = read_members(filepath)
+    assert sorted(members) == sorted("test_addon/" + name for name in FILES)
+    for name, data in FILES.items():
+        assert members["test_addon/" + name][0] == data
+
+    assert members["test_addon/ops.py"][1] == 0o100755
+    assert members["test_addon/__init__.py"][1] == 0o100644
+    assert stats.files == len(FILES)
+
+
+def test_same_files_make_the_same_archive(addon, tmp_path):
+    first, second = tmp_path / "a.zip", tmp_path / "b.zip"
+    export(addon, first)
+    os.utime(str(addon / "ops.py"), (0, 1234567890))
+    export(addon, second, use_table=True)
+
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_unchanged_project_is_not_rewritten(addon, tmp_path):
+    filepath = tmp_path / "out.zip"
+    export(addon, filepath)
+    before = filepath.stat().st_mtime_ns
+
+    stats = export(addon, filepath)
+    assert stats.skipped
+    assert filepath.stat().st_mtime_ns == before
+
+
+def test_changed_member_is_rewritten_and_others_reused(addon, tmp_path):
+    filepath = tmp_path / "out.zip"
+    export(addon, filepath)
+
+    (addon / "ops.py").write_bytes(b"import bpy  # changed\n")
+    stats = export(addon, filepath)
+
+    assert not stats.skipped
+    assert stats.reused == len(FILES) - 1
+    assert read_members(filepath)["test_addon/ops.py"][0] == b"import bpy  # changed\n"
+
+
+def test_large_files_are_streamed(addon, tmp_path, monkeypatch):
+    monkeypatch.setattr(core, 'LARGE_FILE_SIZE', 100)
+    filepath = tmp_path / "out.zip"
+    export(addon, filepath, use_table=True)
+
+    assert read_members(filepath)["test_addon/data/names.txt"][0] == FILES["data/names.txt"]
+
+
+def test_single_file_project(tmp_path):
+    source = tmp_path / "script.py"
+    source.write_bytes(b"print('hi')\n")
+    filepath = tmp_path / "out.zip"
+    export_project(str(source), ["script.py"], str(filepath))
+
+    assert read_members(filepath) == {"script.py": (b"print('hi')\n", 0o100644)}
+
+
+def test_manifest_matches_installed_copy(addon, tmp_path):
+    filepath = tmp_path / "out.zip"
+    export(addon, filepath)
+    manifest = read_manifest(str(filepath) + MANIFEST_SUFFIX)
+
+    with zipfile.ZipFile(str(filepath)) as archive:
+        archive.extractall(str(tmp_path / "installed"))
+    addons = str(tmp_path / "installed")
+    assert verify_manifest(manifest, addons, content=True) == []
+
+    (tmp_path / "installed" / "test_addon" / "ops.py").write_bytes(b"broken")
+    assert verify_manifest(manifest, addons) == ["test_addon/ops.py"]
+
+
+def test_cancel_keeps_the_old_archive(addon, tmp_path):
+    filepath = tmp_path / "out.zip"
+    export(addon, filepath)
+    before = filepath.read_bytes()
+
+    (addon / "ops.py").write_bytes(b"changed\n")
+    task = Task()
+    task.cancel()
+    members = [(str(addon / name), "test_addon/" + name) for name in FILES]
+    with pytest.raises(Cancelled):
+        build_archive(str(filepath), members, task=task)
+
+    assert filepath.read_bytes() == before
+    assert not os.path.exists(str(filepath) + ".tmp")
+
+
+def test_compressed_cache_drops_least_recently_used():
+    cache = CompressedCache(10)
+    cache.put('a', 1, b"12345")
+    cache.put('b', 2, b"1234")
+    cache.get('a')
+    cache.put('c', 3, b"123")
+    cache.put('d', 4, b"x" * 11)
+
+    assert list(cache.items) == ['a', 'c']
+    assert cache.size == 8
@@ -0,0 +1,110 @@
+import os
+import types
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from AddonDevTool import core
+from AddonDevTool.core import (FileIndex, FileTable, ProjectStore, validate_project, check_syntax, export_project,
+                               write_index_cache, PROJECT_FIELDS, MANIFEST_SUFFIX)
+
+# Files in the synthetic addons, and how often each benchmark runs on them
+ROUNDS = {10: 20, 1000: 5, 20000: 2}
+
+# Files in each folder of a synthetic addon
+FOLDER_SIZE = 50
+
+# Projects in the benchmarked project list
+PROJECTS = 50
+
+
+@pytest.fixture(scope='module', params=sorted(ROUNDS), ids=lambda count: "{0}_files".format(count))
+def addon(request, tmp_path_factory):
+    # An addon package of small scripts with a data file now and then, FOLDER_SIZE to a folder
+    count = request.param
+    root = tmp_path_factory.mktemp("addons") / "bench_addon"
+    os.makedirs(str(root))
+    (root / "__init__.py").write_text('bl_info = {"name": "Bench", "blender": (2, 76, 0), '
+                                      '"category": "Development"}\n')
+
+    for i in range(1, count):
+        folder = root / "module_{0}".format(i // FOLDER_SIZE)
+        if not folder.exists():
+            folder.mkdir()
+        if i % 10:
+            (folder / "part_{0}.py".format(i)).write_text("def part_{0}(x):\n    return x + {0}\n".format(i) * 5)
+        else:
+            (folder / "data_{0}.bin".format(i)).write_bytes(os.urandom(512))
+
+    return str(root), count
+
+
+def run(benchmark, count, func, setup=None):
+    return benchmark.pedantic(func, setup=setup, rounds=ROUNDS[count], iterations=1)
+
+
+def scan(path):
+    index = FileIndex(path, (), False)
+    index.refresh()
+    return index
+
+
+def test_walk(benchmark, addon):
+    # Scanning a project that wasn't indexed before
+    path, count = addon
+    index = run(benchmark, count, lambda: scan(path))
+    assert len(index.files()) == count
+
+
+def test_validation(benchmark, addon):
+    # Checking bl_info and compiling every script, without anything cached
+    path, count = addon
+    files = scan(path).files()
+
+    def setup():
+        core.validation_cache.clear()
+        core.compile_cache.clear()
+
+    def validate():
+        return validate_project(path, (2, 79, 0)).messages + check_syntax(FileTable(path), files)
+
+    assert run(benchmark, count, validate, setup) == []
+
+
+def test_zip(benchmark, addon, tmp_path):
+    # Exporting the project from scratch, without a previous archive or cached members
+    path, count = addon
+    files = scan(path).files()
+    filepath = str(tmp_path / "bench_addon.zip")
+
+    def setup():
+        core.compressed_cache.clear()
+        for leftover in (filepath, filepath + MANIFEST_SUFFIX):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    stats = run(benchmark, count, lambda: export_project(path, files, filepath), setup)
+    benchmark.extra_info['bytes_in'] = stats.bytes_in
+    assert stats.files == count
+
+
+def test_registry_save(benchmark, addon, tmp_path):
+    # Flushing a project list along with the cached file index of the addon
+    path, count = addon
+    snapshot = scan(path).snapshot()
+    projects = [types.SimpleNamespace(uid="project_{0}".format(i), **{field: "" for field in PROJECT_FIELDS})
+                for i in range(PROJECTS)]
+    projects[0].location = path
+
+    store = ProjectStore()
+    registry = str(tmp_path / "ADTProjects.json")
+    cache = str(tmp_path / "ADTFileIndex.json")
+
+    def flush():
+        store.update(projects)
+        store.save(registry, force=True)
+        write_index_cache(cache, {projects[0].uid: snapshot})
+
+    run(benchmark, count, flush, store.mark_changed)
+    assert os.path.exists(registry) and os.path.exists(cache)
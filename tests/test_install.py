@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from AddonDevTool import core
+from AddonDevTool.core import FileTable, install_changes, install_project
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "test_addon"
+    os.makedirs(str(root))
+    for name in ("__init__.py", "ops.py", "utils.py"):
+        (root / name).write_text("x = 1\n")
+    core.sync_states.clear()
+    return root
+
+
+def install(project, addons, files):
+    # Copy install like the panel does, remembering the installed hashes
+    table = FileTable(str(project))
+    target = str(addons / "test_addon")
+    changed, state = install_changes(table, files, target)
+    install_project(str(project), files, str(addons))
+    core.sync_states[(table.path, target)] = state
+    return changed
+
+
+def test_copy_install_only_reports_changed_files(project, tmp_path):
+    addons = tmp_path / "addons"
+    os.makedirs(str(addons))
+    files = ["__init__.py", "ops.py", "utils.py"]
+    assert install(project, addons, files) == files
+
+    (project / "ops.py").write_text("x = 2\n")
+    assert install(project, addons, files) == ["ops.py"]
+
+    # Removed files count as changed, so the modules importing them are reloaded
+    os.remove(str(project / "utils.py"))
+    assert install(project, addons, files[:2]) == ["utils.py"]
+
+    # In a new session the installed copy is compared instead
+    core.sync_states.clear()
+    (project / "__init__.py").write_text("x = 3\n")
+    assert install(project, addons, files[:2]) == ["__init__.py"]
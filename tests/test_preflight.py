@@ -0,0 +1,17 @@
+import os
+
+from AddonDevTool.core import FileTable, check_syntax
+
+
+def test_errors_name_the_file_they_are_in(tmp_path):
+    # Files with the same broken content share a cached error, but not its file name
+    for name in ("one.py", "two.py"):
+        (tmp_path / name).write_text("def broken(:\n")
+    table = FileTable(str(tmp_path))
+
+    errors = check_syntax(table, ["one.py", "two.py"])
+    assert [error.split(':')[0] for error in errors] == ["one.py", "two.py"]
+
+    os.rename(str(tmp_path / "one.py"), str(tmp_path / "renamed.py"))
+    errors = check_syntax(table, ["renamed.py", "two.py"])
+    assert [error.split(':')[0] for error in errors] == ["renamed.py", "two.py"]
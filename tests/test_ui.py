@@ -0,0 +1,295 @@
+import os
+import json
+
+import pytest
+
+import bpy
+import AddonDevTool
+from AddonDevTool import core, ui
+
+
+INIT = 'bl_info = {"name": "Test", "blender": (2, 76, 0), "category": "Development"}\n'
+
+
+@pytest.fixture
+def context(tmp_path, monkeypatch):
+    # A registered addon in an empty blend file with one text editor
+    bpy.reset()
+    monkeypatch.setattr(bpy.utils, 'scripts_folder', str(tmp_path / "scripts"))
+    os.makedirs(bpy.utils.scripts_folder)
+
+    monkeypatch.setattr(ui, 'project_store', core.ProjectStore())
+    for cache in (ui.project_statuses, ui.index_snapshots, ui.index_paths, ui.sessions, ui.running_tasks,
+                  core.file_indexes, core.file_tables):
+        cache.clear()
+    ui.active_session[0] = None
+    ui.index_cache_key[0] = None
+
+    AddonDevTool.register()
+    bpy.context.user_preferences.addons['AddonDevTool'] = bpy.types.Addon('AddonDevTool', ui.ADTPreferences())
+    bpy.context.screen = bpy.types.Screen([bpy.types.Area('TEXT_EDITOR')])
+
+    yield bpy.context
+
+    AddonDevTool.unregister()
+
+
+def make_addon(folder, files=("ops.py", "utils.py")):
+    os.makedirs(str(folder))
+    (folder / "__init__.py").write_text(INIT)
+    for name in files:
+        (folder / name).write_text("x = 1\n" * 10)
+    return str(folder)
+
+
+def add_project(context, location, name="Test"):
+    project = ui.add_project(context.scene.project_list)
+    project.name = name
+    project.location = location
+    return project
+
+
+def read_json(filename):
+    with open(os.path.join(bpy.utils.scripts_folder, filename)) as f:
+        return json.load(f)
+
+
+def test_project_list_round_trip(context, tmp_path):
+    project = add_project(context, make_addon(tmp_path / "test_addon"))
+    ui.flush_projects(None)
+
+    # A new blend file picks the project up from the registry
+    context.scene = bpy.types.Scene()
+    ui.get_projects(None)
+
+    loaded = context.scene.project_list[0]
+    assert (loaded.uid, loaded.name, loaded.location) == (project.uid, "Test", project.location)
+
+
+def test_index_snapshots_are_kept_apart_from_the_registry(context, tmp_path):
+    project = add_project(context, make_addon(tmp_path / "test_addon"))
+    ui.get_project_index(project)
+    ui.flush_projects(None)
+
+    assert 'files' not in read_json("ADTProjects.json")['projects'][0].get('meta', {})
+    assert project.uid in read_json("ADTFileIndex.json")['indexes']
+
+    core.file_indexes.clear()
+    ui.get_projects(None)
+    assert project.uid in ui.index_snapshots
+
+    assert ui.get_project_index(project).files() == ("__init__.py", "ops.py", "utils.py")
+    assert project.uid not in ui.index_snapshots
+
+
+def test_status_is_checked_by_the_handler_not_the_panel(context, tmp_path):
+    add_project(context, make_addon(tmp_path / "test_addon"))
+
+    status = ui.get_status(context)
+    assert status.updated == 0 and not status.exists
+
+    ui.update_statuses(None)
+    assert ui.get_status(context) is status
+    assert status.exists and status.messages == [] and status.file_count == 3
+
+
+def test_invalidate_only_marks_the_given_projects(context, tmp_path):
+    first = add_project(context, make_addon(tmp_path / "first"))
+    second = add_project(context, make_addon(tmp_path / "second"))
+    for index in range(2):
+        context.scene.project_list_index = index
+        ui.update_statuses(None)
+
+    ui.invalidate_status(context, [first])
+    assert ui.project_statuses[first.uid].dirty
+    assert not ui.project_statuses[second.uid].dirty
+
+
+def test_scripts_have_no_bl_info_to_check(context, tmp_path):
+    folder = tmp_path / "scripts_project"
+    os.makedirs(str(folder))
+    (folder / "run.py").write_text("print('hi')\n")
+    project = add_project(context, str(folder))
+    project.is_addon = False
+
+    ui.update_statuses(None)
+    assert ui.get_status(context).messages == []
+
+
+def test_running_task_blocks_a_second_install(context, tmp_path):
+    project = add_project(context, make_addon(tmp_path / "test_addon"))
+    ui.update_statuses(None)
+    assert ui.ADTInstallAddon.poll(context)
+
+    ui.running_tasks[project.uid] = core.Task()
+    assert not ui.ADTInstallAddon.poll(context)
+    assert not ui.ADTExport.poll(context)
+
+
+def test_modal_steps_are_profiled():
+    assert ui.ADTInstallAddon.modal.__wrapped__ is ui.ModalTask.modal
+    assert ui.ADTExport.modal.__wrapped__ is ui.ModalTask.modal
+
+
+def test_batch_export_refuses_clashing_archives(context, tmp_path):
+    for folder in ("first", "second"):
+        add_project(context, make_addon(tmp_path / folder / "test_addon"), folder).selected = True
+
+    operator = ui.ADTBatchExport()
+    operator.directory = str(tmp_path / "dist")
+    assert operator.execute(context) == {'CANCELLED'}
+    assert operator.reports[0][0] == {'ERROR'}
+    assert not os.path.exists(operator.directory)
+
+
+def test_session_comes_back_after_closing_and_switching(context, tmp_path):
+    first = add_project(context, make_addon(tmp_path / "first"), "First")
+    add_project(context, make_addon(tmp_path / "second"), "Second")
+    ui.track_session(None)
+
+    ui.open_texts(sorted(ui.get_project_index(first).paths('.py')))
+    text = bpy.data.texts.get("ops.py")
+    text.current_line_index, text.current_character = 4, 2
+    ui.show_text(context, text)
+    text = bpy.data.texts.get("utils.py")
+    text.current_line_index, text.current_character = 3, 1
+
+    # Closing the files and switching away doesn't forget them
+    ui.ADTCloseFiles().execute(context)
+    assert len(bpy.data.texts) == 0
+
+    context.scene.project_list_index = 1
+    ui.track_session(None)
+    context.scene.project_list_index = 0
+    ui.track_session(None)
+
+    # Only the text that was shown is loaded again, the others once they are shown
+    assert sorted(text.name for text in bpy.data.texts) == ["__init__.py", "ops.py", "utils.py"]
+    text = bpy.data.texts.get("ops.py")
+    assert text.filepath and (text.current_line_index, text.current_character) == (4, 2)
+    assert context.screen.areas[0].spaces.active.text is text
+
+    placeholder = bpy.data.texts.get("utils.py")
+    assert not placeholder.filepath and placeholder.get(ui.LAZY_KEY)
+    ui.show_text(context, placeholder)
+    ui.load_shown_texts(None)
+
+    text = context.screen.areas[0].spaces.active.text
+    assert text.name == "utils.py" and text.filepath
+    assert (text.current_line_index, text.current_character) == (3, 1)
+    assert placeholder not in bpy.data.texts
+
+    # Sessions are only written to the registry when flushing
+    assert not ui.project_store.get_meta(first.uid, 'session')
+    ui.flush_projects(None)
+    assert ui.project_store.get_meta(first.uid, 'session')
+
+
+def test_sessions_are_written_when_blender_quits(context, tmp_path):
+    project = add_project(context, make_addon(tmp_path / "test_addon"))
+    ui.track_session(None)
+    ui.open_texts(sorted(ui.get_project_index(project).paths('.py')))
+    ui.save_projects(None)
+
+    # The active project's session is kept up to date in memory
+    ui.active_session[1] = 0.0
+    ui.track_session(None)
+    assert project.uid in ui.sessions
+
+    # Blender has freed its data by the time atexit handlers run
+    scene_context = bpy.context
+    bpy.context = None
+    try:
+        ui.write_projects()
+    finally:
+        bpy.context = scene_context
+
+    session = read_json("ADTProjects.json")['projects'][0]['meta']['session']
+    assert [rel for rel, line, character in session['texts']] == ["__init__.py", "ops.py", "utils.py"]
+    assert ui.flush_projects in bpy.app.handlers.save_pre
+
+
+def test_deleted_files_are_skipped_and_reported(context, tmp_path):
+    folder = tmp_path / "test_addon"
+    project = add_project(context, make_addon(folder))
+    ui.open_texts(sorted(ui.get_project_index(project).paths('.py')))
+
+    # Blender reports a text whose file was deleted as modified
+    os.remove(str(folder / "ops.py"))
+    for text in bpy.data.texts:
+        text.is_modified = True
+
+    operator = ui.ADTRefreshFiles()
+    assert operator.execute(context) == {'FINISHED'}
+    assert operator.reports == [({'WARNING'}, "Loaded external changes to 2 files, 1 no longer exist: ops.py")]
+
+    # A file listed as unopened before it was deleted
+    operator = ui.ADTOpenFile()
+    operator.filepath = str(folder / "gone.py")
+    assert operator.execute(context) == {'CANCELLED'}
+    assert operator.reports[0][0] == {'WARNING'}
+
+
+def test_texts_keep_the_case_of_their_file_names(context, tmp_path, monkeypatch):
+    # Paths are case folded to compare them, like on Windows
+    monkeypatch.setattr(os.path, 'normcase', lambda path: path.lower())
+    project = add_project(context, make_addon(tmp_path / "test_addon", ("MyPanel.py",)))
+
+    ui.update_statuses(None)
+    assert [os.path.basename(path) for path in ui.get_status(context).unopened] == ["MyPanel.py", "__init__.py"]
+
+    ui.ADTOpenFiles().execute(context)
+    text = bpy.data.texts.get("MyPanel.py")
+    assert text and text.filepath == str(tmp_path / "test_addon" / "MyPanel.py")
+
+    ui.update_statuses(None)
+    assert ui.get_status(context).unopened == ()
+    assert [rel for rel, line, character in ui.get_session(context, project)['texts']] == ["MyPanel.py",
+                                                                                        "__init__.py"]
+
+
+def test_watched_changes_wait_for_a_text_editor(context, tmp_path):
+    folder = tmp_path / "test_addon"
+    add_project(context, make_addon(folder))
+    path = str(folder / "ops.py")
+    text = ui.open_texts([path])[0]
+    ui.get_preferences().watch_files = True
+
+    # Without a text editor the change stays queued
+    context.screen = bpy.types.Screen()
+    ui.file_watcher.changed.add(path)
+    ui.apply_file_changes(None)
+    assert path in ui.file_watcher.changed
+
+    # Saving the text from Blender changed the file, but there is nothing to load
+    context.screen = bpy.types.Screen([bpy.types.Area('TEXT_EDITOR')])
+    ui.apply_file_changes(None)
+    assert not ui.file_watcher.changed and not bpy.ops.calls
+
+    text.is_modified = True
+    ui.file_watcher.changed.add(path)
+    ui.apply_file_changes(None)
+
+    name, override, kwargs = bpy.ops.calls[-1]
+    assert name == "text.reload" and override['edit_text'] is text
+    assert override['region'].type == 'WINDOW' and override['space_data'] is override['area'].spaces.active
+
+
+def test_index_cache_is_written_when_blender_quits(context, tmp_path):
+    project = add_project(context, make_addon(tmp_path / "test_addon"))
+    ui.get_project_index(project)
+    ui.save_projects(None)
+
+    scene_context = bpy.context
+    bpy.context = None
+    try:
+        ui.write_projects()
+    finally:
+        bpy.context = scene_context
+
+    assert project.uid in read_json("ADTFileIndex.json")['indexes']
+
+    # Nothing changed, so it isn't written again
+    os.remove(os.path.join(bpy.utils.scripts_folder, "ADTFileIndex.json"))
+    ui.write_projects()
+    assert not os.path.exists(os.path.join(bpy.utils.scripts_folder, "ADTFileIndex.json"))